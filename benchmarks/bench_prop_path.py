@@ -0,0 +1,92 @@
+"""属性路径取值性能测试：get_value 与协调器解码使用的 PathTable 对比
+
+直接加载 converters/path.py，不需要安装Home Assistant：
+
+    python benchmarks/bench_prop_path.py [响应文件.json]
+
+响应文件按接口路径保存queryDefaultCarStatus和其他API的响应，默认使用
+fixtures/car_status_responses.json（车辆标识、位置、车主信息已替换为REDACTED或0）。
+开启调试模式后可以在调试日志中复制自己车辆的响应，脱敏后按同样格式保存再运行对比。
+"""
+import ast
+import importlib.util
+import json
+import os
+import sys
+import timeit
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+ROOT = os.path.join(HERE, '..', 'custom_components', 'wuling')
+FIXTURE = os.path.join(HERE, 'fixtures', 'car_status_responses.json')
+
+# 其他API的响应在协调器数据中的分组，与StateCoordinator.async_update_*一致
+SECTIONS = {
+    'car/check/all': 'checkStatus',
+    'car/info/tire/pressure': 'tirePressure',
+    'car/yesterday/mileage': 'yesterdayMileage',
+}
+
+
+def load_path_module():
+    spec = importlib.util.spec_from_file_location('wuling_path', os.path.join(ROOT, 'converters', 'path.py'))
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def load_props():
+    """从sensors_config.py的语法树中读取全部转换器的属性路径（prop，未设置时为attr）"""
+    with open(os.path.join(ROOT, 'sensors_config.py'), encoding='utf-8') as f:
+        tree = ast.parse(f.read())
+    props = []
+    for node in ast.walk(tree):
+        if not (isinstance(node, ast.Call) and isinstance(node.func, ast.Name) and node.func.id.endswith('Conv')):
+            continue
+        if not node.args or not isinstance(node.args[0], ast.Constant):
+            continue
+        keywords = {kw.arg: kw.value.value for kw in node.keywords if isinstance(kw.value, ast.Constant)}
+        props.append(keywords.get('prop') or node.args[0].value)
+    return props
+
+
+def load_payload(path):
+    """按协调器的方式把各API的响应合并为一份数据"""
+    with open(path, encoding='utf-8') as f:
+        responses = json.load(f)
+    default = responses['userCarRelation/queryDefaultCarStatus']
+    data = dict(default.get('data') or {})
+    data['basic_api_timestamp'] = default.get('systemTimeMillis')
+    for api, section in SECTIONS.items():
+        if api in responses:
+            data[section] = responses[api].get('data') or {}
+    return data
+
+
+def main():
+    module = load_path_module()
+    props = load_props()
+    data = load_payload(sys.argv[1] if len(sys.argv) > 1 else FIXTURE)
+    # 与StateCoordinator.decode使用同一个PathTable，键为属性路径本身
+    table = module.PathTable((prop, module.PropPath(prop)) for prop in props)
+
+    def baseline():
+        result = []
+        for prop in props:
+            result.append(module.get_value(data, prop, None))
+        return result
+
+    def compiled():
+        return [value for _, value in table.values(data)]
+
+    assert baseline() == compiled()
+
+    number = 20000
+    timings = {}
+    for name, func in (('get_value', baseline), ('PathTable', compiled)):
+        timings[name] = min(timeit.repeat(func, number=number, repeat=9)) / number
+        print(f'{name:>10}: {timings[name] * 1e6:8.2f} us per decode ({len(props)} props)')
+    print(f'{"speedup":>10}: {timings["get_value"] / timings["PathTable"]:8.2f}x')
+
+
+if __name__ == '__main__':
+    main()
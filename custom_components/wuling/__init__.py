@@ -3,19 +3,45 @@ import voluptuous as vol
 
 from homeassistant.core import HomeAssistant, ServiceCall, SupportsResponse
 from homeassistant.config_entries import ConfigEntry
+from homeassistant.exceptions import ConfigEntryAuthFailed
 
-from .const import DOMAIN, SUPPORTED_PLATFORMS, _LOGGER
+from .const import DOMAIN, SUPPORTED_PLATFORMS, RUNTIME_OPTIONS, _LOGGER
 from .coordinator import StateCoordinator
+from .snapshot import SnapshotStore
+from .geocache import async_remove_geocode_cache
 from .entities import XEntity
 
 
 async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry):
     hass.data.setdefault(entry.entry_id, {})
     hass.data[entry.entry_id].setdefault('entities', {})
+    snapshot_store = SnapshotStore(hass, entry.entry_id)
+    snapshot = await snapshot_store.async_load()
+
     coordinator = StateCoordinator(hass, entry)
-    await coordinator.async_config_entry_first_refresh()
-    await coordinator.check_auth()
+    coordinator.snapshot = snapshot_store
+    warm_start = bool(snapshot.get('default'))
+    if warm_start:
+        # 热启动：先用上次保存的数据创建实体，首次刷新在后台进行，不等待五菱云端
+        coordinator.async_restore(snapshot['default'])
+    else:
+        try:
+            await coordinator.async_config_entry_first_refresh()
+            await coordinator.check_auth()
+        except Exception:
+            # 设置失败时释放账号中心的引用，避免连接池泄漏
+            await coordinator.async_shutdown()
+            raise
+    # 按VIN登记到账号中心，同一辆车只由一个配置条目轮询
+    coordinator.hub.attach(coordinator)
     hass.data[entry.entry_id]['coordinator'] = coordinator
+    await coordinator.async_start_push()
+
+    if warm_start:
+        # 配置条目卸载时后台任务随之取消
+        entry.async_create_background_task(
+            hass, async_warm_start_refresh(hass, entry, coordinator), f'{DOMAIN}_warm_start_refresh',
+        )
 
     hass.services.async_register(
         DOMAIN, 'update_status', coordinator.update_from_service,
@@ -25,9 +51,45 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry):
 
     await hass.config_entries.async_forward_entry_setups(entry, SUPPORTED_PLATFORMS)
 
+    # 通过选项修改的配置在重新加载配置条目后生效
+    hass.data[entry.entry_id]['reload_config'] = _reload_config(entry)
+    entry.async_on_unload(entry.add_update_listener(async_update_options))
+
     return True
 
 
+def _reload_config(entry: ConfigEntry) -> dict:
+    """需要重新加载才能生效的配置，由实体直接修改并立即生效的选项除外"""
+    options = {k: v for k, v in entry.options.items() if k not in RUNTIME_OPTIONS}
+    return {**entry.data, **options}
+
+
+async def async_update_options(hass: HomeAssistant, entry: ConfigEntry):
+    """配置条目更新时，只有需要重新加载的配置变化才重新加载"""
+    if hass.data.get(entry.entry_id, {}).get('reload_config') == _reload_config(entry):
+        return
+    _LOGGER.info('配置已修改，重新加载配置条目')
+    await hass.config_entries.async_reload(entry.entry_id)
+
+
+async def async_warm_start_refresh(hass: HomeAssistant, entry: ConfigEntry, coordinator: StateCoordinator):
+    """热启动后在后台刷新车辆数据并验证账号"""
+    await coordinator.async_refresh()
+    try:
+        await coordinator.check_auth()
+    except ConfigEntryAuthFailed as exc:
+        # 热启动时配置条目已加载，由用户在重新验证流程中更新登陆令牌
+        _LOGGER.error('五菱账号验证失败，请重新配置登陆令牌: %s', exc)
+        entry.async_start_reauth(hass)
+
+
+async def async_remove_entry(hass: HomeAssistant, entry: ConfigEntry):
+    """删除配置条目时一并删除车辆数据快照，删除最后一个配置条目时同时删除逆地理编码缓存"""
+    await SnapshotStore(hass, entry.entry_id).async_remove()
+    if not any(other.entry_id != entry.entry_id for other in hass.config_entries.async_entries(DOMAIN)):
+        await async_remove_geocode_cache(hass)
+
+
 async def async_unload_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     """卸载配置项并释放资源"""
     # 取消平台设置
@@ -38,7 +100,7 @@ async def async_unload_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     
     # 清理数据
     if entry.entry_id in hass.data:
-        # 取消协调器的更新
+        # 取消协调器的更新，并从账号中心注销
         coordinator = hass.data[entry.entry_id].get('coordinator')
         if coordinator:
             await coordinator.async_shutdown()
@@ -0,0 +1,134 @@
+import hashlib
+from typing import Optional
+
+import aiohttp
+
+from homeassistant.const import EVENT_HOMEASSISTANT_CLOSE
+from homeassistant.core import Event, HomeAssistant
+
+from .const import (
+    _LOGGER,
+    sgmwnonce, sgmwappcode, sgmwappversion,
+    sgmwsystem, sgmwsystemversion
+)
+
+try:
+    # orjson随Home Assistant安装，解析速度明显快于标准库
+    from orjson import loads as json_loads
+except ImportError:
+    from json import loads as json_loads
+
+try:
+    from homeassistant.util.ssl import get_default_context
+except ImportError:  # 旧版本Home Assistant
+    get_default_context = None
+
+# 连接池参数：总连接数、单主机连接数、DNS缓存时间和空闲连接保活时间（秒）
+CONNECTION_LIMIT = 20
+CONNECTION_LIMIT_PER_HOST = 8
+DNS_CACHE_TTL = 300
+KEEPALIVE_TIMEOUT = 60
+
+REQUEST_TIMEOUT = aiohttp.ClientTimeout(total=30)
+
+# 与账号无关的固定请求头
+STATIC_HEADERS = {
+    'Accept': 'application/json',
+    'Accept-Encoding': 'gzip, deflate',
+    'Content-Type': 'application/json; charset=UTF-8',
+    'User-Agent': 'okhttp/4.9.0',
+    'channel': 'linglingbang',
+    'platformNo': 'Android',
+    'appVersionCode': '1677',
+    'version': 'V8.2.10',
+    'imei': 'a-c62b2f538bf34758',
+    'imsi': 'unknown',
+    'deviceModel': 'MI 8',
+    'deviceBrand': 'Xiaomi',
+    'deviceType': 'Android',
+    'accessChannel': '1',
+    'sgmwnonce': sgmwnonce,
+    'sgmwappcode': sgmwappcode,
+    'sgmwappversion': sgmwappversion,
+    'sgmwsystem': sgmwsystem,
+    'sgmwsystemversion': sgmwsystemversion,
+}
+
+
+class WulingApiClient:
+    """五菱云端API客户端
+
+    使用独立的连接池（长连接、DNS缓存、连接数限制）访问openapi.baojun.net，
+    每组账号凭据的静态请求头和签名前缀只计算一次，每次请求只需补充时间戳和签名。
+    """
+
+    def __init__(self, hass: HomeAssistant, access_token: str, client_id: str, client_secret: str):
+        self.hass = hass
+        self.credentials = (access_token, client_id, client_secret)
+        self._session: Optional[aiohttp.ClientSession] = None
+        self._unsub_close = None  # Home Assistant关闭时关闭连接池的监听
+
+        self._headers = {
+            **STATIC_HEADERS,
+            'sgmwaccesstoken': access_token,
+            'sgmwclientid': client_id,
+            'sgmwclientsecret': client_secret,
+        }
+        # 签名为md5(access_token + timestamp + nonce + client_id + client_secret + app/system信息)，
+        # 时间戳之前的部分预先计算md5状态，之后的部分预先拼接
+        self._sign_prefix = hashlib.md5(access_token.encode())
+        self._sign_suffix = (
+            sgmwnonce + client_id + client_secret +
+            sgmwappcode + sgmwappversion + sgmwsystem + sgmwsystemversion
+        ).encode()
+
+    @property
+    def session(self) -> aiohttp.ClientSession:
+        if self._session is None or self._session.closed:
+            connector = aiohttp.TCPConnector(
+                limit=CONNECTION_LIMIT,
+                limit_per_host=CONNECTION_LIMIT_PER_HOST,
+                ttl_dns_cache=DNS_CACHE_TTL,
+                keepalive_timeout=KEEPALIVE_TIMEOUT,
+                ssl=get_default_context() if get_default_context else True,
+            )
+            self._session = aiohttp.ClientSession(connector=connector, timeout=REQUEST_TIMEOUT)
+            if self._unsub_close is None:
+                # 配置条目未卸载就关闭Home Assistant时也要关闭连接池，避免Unclosed client session警告
+                self._unsub_close = self.hass.bus.async_listen_once(EVENT_HOMEASSISTANT_CLOSE, self._async_close_on_stop)
+        return self._session
+
+    async def _async_close_on_stop(self, event: Event):
+        self._unsub_close = None
+        await self.close()
+
+    def sign(self, timestamp) -> str:
+        """计算请求签名"""
+        sign = self._sign_prefix.copy()
+        sign.update(str(timestamp).encode())
+        sign.update(self._sign_suffix)
+        return sign.hexdigest()
+
+    def build_headers(self, timestamp, extra: Optional[dict] = None) -> dict:
+        """在静态请求头的基础上补充时间戳、签名和额外请求头"""
+        headers = self._headers.copy()
+        headers['sgmwtimestamp'] = str(timestamp)
+        headers['sgmwsignature'] = self.sign(timestamp)
+        if extra:
+            headers.update(extra)
+        return headers
+
+    async def request(self, method: str, url: str, **kwargs):
+        """发送请求，返回状态码和响应文本"""
+        async with self.session.request(method, url, **kwargs) as res:
+            return res.status, await res.text() or ''
+
+    async def close(self):
+        """关闭连接池"""
+        if self._unsub_close is not None:
+            self._unsub_close()
+            self._unsub_close = None
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+            _LOGGER.debug('Wuling API session closed')
+        self._session = None
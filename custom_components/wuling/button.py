@@ -13,13 +13,13 @@ _LOGGER = logging.getLogger(__name__)
 
 async def async_setup_entry(hass, entry, async_add_entities):
     attrs = []
+    entities = []
     coordinator = hass.data[entry.entry_id]['coordinator']
-    for conv in coordinator.converters:
-        # 只检查domain，不检查parent，允许子实体被添加
-        if conv.domain != ENTITY_DOMAIN:
-            continue
+    for conv in coordinator.domain_converters.get(ENTITY_DOMAIN, []):
         attrs.append(conv.attr)
-        async_add_entities([ButtonEntity(coordinator, conv)])
+        entities.append(ButtonEntity(coordinator, conv))
+    # 实体一次性添加
+    async_add_entities(entities)
     _LOGGER.info('async_setup_entry: %s', [ENTITY_DOMAIN, attrs])
 
 
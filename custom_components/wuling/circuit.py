@@ -0,0 +1,38 @@
+import time
+
+from .const import CIRCUIT_FAILURE_THRESHOLD, CIRCUIT_COOLDOWN
+
+STATE_CLOSED = 'closed'  # 正常
+STATE_OPEN = 'open'  # 熔断中，暂停请求
+STATE_HALF_OPEN = 'half_open'  # 冷却结束，允许一次试探请求
+
+
+class CircuitBreaker:
+    """单个API端点的熔断器
+
+    连续失败达到阈值后熔断，冷却期内不再请求该端点；冷却结束后放行一次试探请求，
+    成功则恢复，失败则重新熔断。
+    """
+
+    def __init__(self, threshold: int = CIRCUIT_FAILURE_THRESHOLD, cooldown: float = CIRCUIT_COOLDOWN):
+        self.threshold = threshold
+        self.cooldown = cooldown
+        self.state = STATE_CLOSED
+        self.failures = 0
+        self.opened_at = 0
+
+    def allow(self) -> bool:
+        """当前是否允许请求"""
+        if self.state == STATE_OPEN and time.monotonic() - self.opened_at >= self.cooldown:
+            self.state = STATE_HALF_OPEN
+        return self.state != STATE_OPEN
+
+    def record_success(self):
+        self.failures = 0
+        self.state = STATE_CLOSED
+
+    def record_failure(self):
+        self.failures += 1
+        if self.state == STATE_HALF_OPEN or self.failures >= self.threshold:
+            self.state = STATE_OPEN
+            self.opened_at = time.monotonic()
@@ -6,18 +6,40 @@ from homeassistant.const import (
     CONF_CLIENT_SECRET,
 )
 from homeassistant.core import callback
-from .const import DOMAIN, TITLE, CONF_AMAP_KEY
+from .const import DOMAIN, TITLE, CONF_AMAP_KEY, CONF_MQTT_TOPIC, ADVANCED_OPTIONS
 
 
-def get_schemas(defaults):
+def get_auth_schemas(defaults):
     return vol.Schema({
         vol.Required(CONF_ACCESS_TOKEN, default=defaults.get(CONF_ACCESS_TOKEN)): str,
         vol.Required(CONF_CLIENT_ID, default=defaults.get(CONF_CLIENT_ID)): str,
         vol.Required(CONF_CLIENT_SECRET, default=defaults.get(CONF_CLIENT_SECRET)): str,
+    })
+
+
+def get_schemas(defaults):
+    return get_auth_schemas(defaults).extend({
         vol.Optional(CONF_AMAP_KEY, default=defaults.get(CONF_AMAP_KEY, '')): str,
+        vol.Optional(CONF_MQTT_TOPIC, default=defaults.get(CONF_MQTT_TOPIC, '')): str,
     })
 
 
+def get_options_schemas(defaults):
+    """选项表单：账号配置之外增加轮询和请求参数，没有默认值的参数留空表示由其他选项推算"""
+    schema = {}
+    for key, default in ADVANCED_OPTIONS.items():
+        if key in ('other_api_spacing', 'request_cache_ttl'):
+            validator = vol.All(vol.Coerce(float), vol.Range(min=0))
+        else:
+            validator = vol.All(vol.Coerce(int), vol.Range(min=1))
+        if default is None:
+            marker = vol.Optional(key, description={'suggested_value': defaults.get(key)})
+        else:
+            marker = vol.Optional(key, default=defaults.get(key, default))
+        schema[marker] = validator
+    return get_schemas(defaults).extend(schema)
+
+
 class ConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
     CONNECTION_CLASS = config_entries.CONN_CLASS_CLOUD_POLL
 
@@ -40,6 +62,26 @@ class ConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
             description_placeholders={'tip': self.context.pop('tip', '')},
         )
 
+    async def async_step_reauth(self, entry_data):
+        """登陆令牌失效时重新验证"""
+        return await self.async_step_reauth_confirm()
+
+    async def async_step_reauth_confirm(self, user_input=None):
+        entry = self.hass.config_entries.async_get_entry(self.context['entry_id'])
+        if user_input:
+            self.hass.config_entries.async_update_entry(entry, data={**entry.data, **user_input})
+            # 已加载的配置条目由选项更新监听器重新加载，设置失败的配置条目在这里重新加载
+            if entry.state is not config_entries.ConfigEntryState.LOADED:
+                self.hass.async_create_task(self.hass.config_entries.async_reload(entry.entry_id))
+            return self.async_abort(reason='reauth_successful')
+
+        self.context['tip'] = '登陆令牌已失效，请重新抓包获取以下参数'
+        return self.async_show_form(
+            step_id='reauth_confirm',
+            data_schema=get_auth_schemas(entry.data),
+            description_placeholders={'tip': self.context.pop('tip', '')},
+        )
+
 
 class OptionsFlowHandler(config_entries.OptionsFlow):
     async def async_step_init(self, user_input=None):
@@ -48,11 +90,17 @@ class OptionsFlowHandler(config_entries.OptionsFlow):
             user_input = {}
         # 当用户提交配置时，保存所有字段，包括空字段
         if user_input:
-            # 更新配置条目
+            # 账号配置同时保存到配置条目的data中
+            entry_data = {k: v for k, v in user_input.items() if k not in ADVANCED_OPTIONS}
             self.hass.config_entries.async_update_entry(
-                self.config_entry, data={**self.config_entry.data, **user_input}
+                self.config_entry, data={**self.config_entry.data, **entry_data}
             )
-            return self.async_create_entry(title='', data=user_input)
+            # 与已有选项合并，保留刷新速率、调试模式等由实体写入的选项
+            options = {**self.config_entry.options, **user_input}
+            for key, default in ADVANCED_OPTIONS.items():
+                if default is None and key not in user_input:
+                    options.pop(key, None)
+            return self.async_create_entry(title='', data=options)
         defaults = {
             **self.config_entry.data,
             **self.config_entry.options,
@@ -60,6 +108,6 @@ class OptionsFlowHandler(config_entries.OptionsFlow):
         }
         return self.async_show_form(
             step_id='init',
-            data_schema=get_schemas(defaults),
+            data_schema=get_options_schemas(defaults),
             description_placeholders={'tip': self.context.pop('tip', '')},
         )
@@ -17,6 +17,7 @@ from homeassistant.const import (
 
 # 高德API配置
 CONF_AMAP_KEY = 'amap_key'  # 高德地图API密钥，用于备用定位服务
+CONF_MQTT_TOPIC = 'mqtt_topic'  # 车辆状态推送的MQTT主题，可包含{vin}占位符，留空则只轮询
 
 DOMAIN = 'wuling'
 TITLE = '五菱汽车'
@@ -74,9 +75,96 @@ SETTINGS_ENTITIES = {
     'check_api_timestamp',
     'tire_api_timestamp',
     'yesterday_mileage_api_timestamp',
-    'last_door_notification_time'  # 车门未关通知时间
+    'last_door_notification_time',  # 车门未关通知时间
+    'api_circuit_state',  # API熔断状态
 }
 
+# 其他API端点及其独立刷新速率的配置项，未配置时使用other_api_refresh_rate
+OTHER_API_ENDPOINTS = {
+    'car/check/all': 'check_api_refresh_rate',
+    'car/info/tire/pressure': 'tire_api_refresh_rate',
+    'car/yesterday/mileage': 'yesterday_mileage_api_refresh_rate',
+}
+
+# 同一API主机和账号共享的限流参数：每秒补充的请求数和最大突发请求数
+API_RATE_LIMIT = 1.0
+API_RATE_BURST = 5
+
+# 只读接口失败重试：最大尝试次数、指数退避的基础和最大延迟（秒）
+API_RETRY_ATTEMPTS = 3
+API_RETRY_BASE_DELAY = 1.0
+API_RETRY_MAX_DELAY = 10.0
+
+# 端点熔断：连续失败多少轮后熔断，以及熔断冷却时间（秒）
+CIRCUIT_FAILURE_THRESHOLD = 3
+CIRCUIT_COOLDOWN = 300
+# 车辆状态接口熔断且持续失败超过多少秒后实体显示为不可用，此前实体保持可用并显示最后一次成功的数据
+STALE_UNAVAILABLE_AFTER = 1800
+
+# 控制指令接口前缀，限流时优先于后台轮询
+CONTROL_API_PREFIX = 'car/control/'
+
+# 只读接口，相同请求的结果可以在短时间内复用
+READ_ONLY_APIS = {
+    'userCarRelation/queryDefaultCarStatus',
+    'car/check/all',
+    'car/info/tire/pressure',
+    'car/yesterday/mileage',
+}
+
+# 推送通道静默多少秒后恢复轮询
+MQTT_SILENCE_TIMEOUT = 300
+
+# 车辆休眠退避：熄火后连续多少次轮询没有新数据开始放慢轮询，以及放慢后的最大轮询间隔（秒）
+IDLE_BACKOFF_AFTER = 3
+IDLE_MAX_REFRESH_INTERVAL = 600
+
+# 选项中可调整的轮询和请求参数及其默认值，None表示未设置时由其他选项推算
+ADVANCED_OPTIONS = {
+    'other_api_concurrency': 3,  # 其他API并发刷新数
+    'other_api_spacing': 0,  # 其他API请求起始间隔（秒）
+    'check_api_refresh_rate': None,  # 车况检查固定刷新速率（秒）
+    'tire_api_refresh_rate': None,  # 胎压固定刷新速率（秒）
+    'yesterday_mileage_api_refresh_rate': None,  # 昨日里程固定刷新速率（秒）
+    'tire_api_active_refresh_rate': 60,  # 钥匙通电时胎压刷新速率（秒）
+    'check_api_parked_refresh_rate': None,  # 停车时车况检查刷新速率（秒），默认为其他API刷新速率且不少于1小时
+    'yesterday_mileage_api_offset': 600,  # 零点后多少秒刷新昨日里程
+    'request_cache_ttl': 2,  # 只读接口结果复用时间（秒）
+    'mqtt_silence_timeout': MQTT_SILENCE_TIMEOUT,
+    'idle_max_refresh_rate': IDLE_MAX_REFRESH_INTERVAL,
+}
+
+# 由实体修改并立即生效的选项，修改后不需要重新加载配置条目
+RUNTIME_OPTIONS = ('basic_api_refresh_rate', 'other_api_refresh_rate', 'debug_mode', 'selected_mobile_device')
+
+# 车辆数据快照的存储版本和延迟写入时间（秒），用于重启时快速恢复实体
+SNAPSHOT_VERSION = 1
+SNAPSHOT_SAVE_DELAY = 60
+
+# 逆地理编码缓存：存储版本、最多缓存的格子数、有效期和延迟写入时间（秒）、geohash精度（7约为150米）
+GEOCODE_CACHE_VERSION = 1
+GEOCODE_CACHE_SIZE = 2000
+GEOCODE_CACHE_TTL = 30 * 24 * 3600
+GEOCODE_CACHE_SAVE_DELAY = 300
+GEOCODE_PRECISION = 7
+# 车辆移动距离小于该值（米）时沿用上次的地址，不重新查询
+GEOCODE_MIN_DISTANCE = 50
+# 高德批量逆地理编码：合并查询的等待时间（秒）和每次请求的最大坐标数（高德上限为20）
+GEOCODE_BATCH_WINDOW = 0.3
+GEOCODE_BATCH_SIZE = 20
+# 离线行政区划数据：custom_components/wuling/data下的文件名（按顺序查找）和网格索引的格子大小（度）
+REGION_DATA_FILES = ('districts.geojson.gz', 'districts.geojson')
+REGION_GRID_SIZE = 0.25
+
+# 每辆车在内存中保留的最近API请求记录条数，用于诊断信息
+API_EXCHANGE_HISTORY = 50
+
+# 调试日志：单个文件最大字节数、保留的压缩备份数、内存中最多排队的行数和每批写入的最大行数
+DEBUG_LOG_MAX_BYTES = 5 * 1024 * 1024
+DEBUG_LOG_BACKUP_COUNT = 3
+DEBUG_LOG_QUEUE_SIZE = 5000
+DEBUG_LOG_BATCH_SIZE = 500
+
 _LOGGER = logging.getLogger(__name__)
 
 # API configuration
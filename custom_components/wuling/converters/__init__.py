@@ -2,6 +2,8 @@
 
 from .base import (
     get_value,
+    PropPath,
+    PathTable,
     Converter,
     BoolConv,
     MapConv,
@@ -14,4 +16,5 @@ from .base import (
     TimeStampConv,
     SelectConv,
     TireTempConv,
+    CircuitStateConv,
 )
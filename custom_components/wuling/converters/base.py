@@ -7,26 +7,13 @@ import logging
 
 _LOGGER = logging.getLogger(__name__)
 
+from .path import get_value, PropPath, PathTable
+from ..circuit import STATE_CLOSED, STATE_OPEN, STATE_HALF_OPEN
+
 if TYPE_CHECKING:
     from .. import StateCoordinator as Client
 
 
-def get_value(obj, key, def_value=None):
-    keys = f'{key}'.split('.')
-    result = obj
-    for k in keys:
-        if result is None:
-            return def_value
-        if isinstance(result, dict):
-            result = result.get(k, def_value)
-        elif isinstance(result, (list, tuple)):
-            try:
-                result = result[int(k)]
-            except (ValueError, IndexError):
-                result = def_value
-    return result
-
-
 @dataclass
 class Converter:
     attr: str  # hass attribute
@@ -41,6 +28,7 @@ class Converter:
     # don't init with dataclass because no type:
     childs: Optional[set] = None
     option = None
+    path = None  # 预编译的属性路径，由compile()生成
 
     # to hass
     def decode(self, client: "Client", payload: dict, value: Any):
@@ -54,6 +42,11 @@ class Converter:
         self.option = option
         return self
 
+    def compile(self):
+        """预编译属性路径，避免每次解码时重复拆分字符串"""
+        self.path = PropPath(self.prop or self.attr)
+        return self
+
 @dataclass
 class BoolConv(Converter):
     reverse: bool = None
@@ -227,6 +220,27 @@ class BaseInfoConv(Converter):
             if car_info_key in car_info:
                 payload[attr_name] = car_info[car_info_key]
 
+@dataclass
+class CircuitStateConv(SensorConv):
+    """API熔断状态转换器，主状态为最严重的端点状态，childs中的各端点状态作为属性
+
+    最近一次请求失败、正在使用旧数据的端点列在stale_apis属性中。
+    """
+
+    def decode(self, client: "Client", payload: dict, value: Any):
+        states = value or {}
+        for api in self.childs or ():
+            if api != 'stale_apis':
+                payload[api] = states.get(api, STATE_CLOSED)
+        payload['stale_apis'] = list(client.data.get('api_stale') or ())
+        values = set(states.values())
+        if STATE_OPEN in values:
+            payload[self.attr] = STATE_OPEN
+        elif STATE_HALF_OPEN in values:
+            payload[self.attr] = STATE_HALF_OPEN
+        else:
+            payload[self.attr] = STATE_CLOSED
+
 @dataclass
 class TimeStampConv(SensorConv):
     """时间戳转换器，将毫秒级时间戳转换为datetime对象"""
@@ -263,7 +277,8 @@ class NumberConv(Converter):
         """Decode value for HASS."""
         # 对于设置实体，我们需要从协调器获取当前值
         if self.attr == 'basic_api_refresh_rate':
-            payload[self.attr] = client.update_interval.total_seconds()
+            # 显示用户设置的刷新速率，不受动态加速、休眠退避和推送的临时调整影响
+            payload[self.attr] = client.original_update_interval.total_seconds()
         elif self.attr == 'other_api_refresh_rate':
             # 检查协调器是否保存了用户设置的值
             if hasattr(client, 'other_api_refresh_rate'):
@@ -286,7 +301,8 @@ class NumberConv(Converter):
                 client.original_update_interval = new_interval
                 
                 # 如果当前不是临时调整状态，直接更新刷新速率
-                if client.temp_update_interval is None:
+                # 从协调器不轮询，推送期间只在静默后轮询，两种情况都不立即修改刷新间隔
+                if client.temp_update_interval is None and client.hub.is_leader(client) and not client.push_active:
                     client.update_interval = new_interval
                 
                 # 保存到配置条目选项
@@ -304,12 +320,10 @@ class NumberConv(Converter):
                 client.hass.config_entries.async_update_entry(
                     client.entry, options=options
                 )
-                # 修改协调器中的相关变量，使其立即重新获取数据
-                client.last_check_time = 0
-                client.last_tire_time = 0
-                client.last_yesterday_mileage_time = 0
-                # 重启其他API的独立刷新任务
-                client._async_start_other_api_refresh()
+                # 使用该刷新速率的端点按新速率立即重新获取数据，调度任务无需重建
+                endpoints = client.other_rate_endpoints()
+                if endpoints:
+                    client.other_api_scheduler.reschedule(*endpoints)
                 return {self.attr: value}
             return {}
         return _encode()
@@ -0,0 +1,94 @@
+# 属性路径访问工具，不依赖Home Assistant，便于单独做性能测试
+
+
+def get_value(obj, key, def_value=None):
+    keys = f'{key}'.split('.')
+    result = obj
+    for k in keys:
+        if result is None:
+            return def_value
+        if isinstance(result, dict):
+            result = result.get(k, def_value)
+        elif isinstance(result, (list, tuple)):
+            try:
+                result = result[int(k)]
+            except (ValueError, IndexError):
+                result = def_value
+    return result
+
+
+def _to_index(key: str):
+    try:
+        return int(key)
+    except ValueError:
+        return None
+
+
+class PropPath:
+    """预编译的属性路径，如 carStatus.batterySoc
+
+    路径只在创建时拆分一次，section为顶层分组（如carStatus、tirePressure），
+    取值行为与get_value保持一致。
+    """
+    __slots__ = ('prop', 'section', 'steps', 'leaf')
+
+    def __init__(self, prop: str):
+        keys = f'{prop}'.split('.')
+        self.prop = prop
+        self.section = keys[0]
+        # 每一步同时保存字典键和列表下标，列表下标无效时为None
+        self.steps = tuple((k, _to_index(k)) for k in keys[1:])
+        # 绝大多数路径只有两级（分组.字段），单独保存末级键走快速路径
+        self.leaf = keys[1] if len(keys) == 2 else None
+
+    def __repr__(self):
+        return f'PropPath({self.prop!r})'
+
+    def get(self, obj, def_value=None):
+        """从完整数据中取值"""
+        if not isinstance(obj, dict):
+            return get_value(obj, self.prop, def_value)
+        return self.get_in_section(obj.get(self.section, def_value), def_value)
+
+    def get_in_section(self, result, def_value=None):
+        """从已取出的顶层分组中继续取值"""
+        if self.leaf is not None and type(result) is dict:
+            return result.get(self.leaf, def_value)
+        for key, index in self.steps:
+            if result is None:
+                return def_value
+            if isinstance(result, dict):
+                result = result.get(key, def_value)
+            elif isinstance(result, (list, tuple)):
+                if index is None:
+                    result = def_value
+                else:
+                    try:
+                        result = result[index]
+                    except IndexError:
+                        result = def_value
+        return result
+
+
+class PathTable:
+    """按顺序取值的一组预编译路径
+
+    每次取值时每个顶层分组只从数据中取一次，各路径在分组内取值；
+    协调器解码和性能测试共用同一份实现。
+    """
+    __slots__ = ('entries', 'sections')
+
+    def __init__(self, items):
+        """items为(键, PropPath)序列，键原样随值返回，如转换器"""
+        self.entries = tuple((key, path.section, path.leaf, path) for key, path in items)
+        self.sections = frozenset(section for _, section, _, _ in self.entries)
+
+    def values(self, data: dict):
+        """依次返回(键, 值)"""
+        sections = {section: data.get(section) for section in self.sections}
+        for key, name, leaf, path in self.entries:
+            section = sections[name]
+            if leaf is not None and type(section) is dict:
+                yield key, section.get(leaf)
+            else:
+                yield key, path.get_in_section(section)
@@ -1,27 +1,49 @@
-import aiohttp
+import asyncio
 import hashlib
 import json
+import random
 import time
+from collections import deque
 from datetime import timedelta
 
-from homeassistant.core import HomeAssistant, State, ServiceCall, SupportsResponse
+from homeassistant.core import HomeAssistant, State, ServiceCall, SupportsResponse, callback
 from homeassistant.config_entries import ConfigEntry
 from homeassistant.const import (
     CONF_ACCESS_TOKEN,
     CONF_CLIENT_ID,
     CONF_CLIENT_SECRET,
 )
-from homeassistant.helpers.update_coordinator import DataUpdateCoordinator
-from homeassistant.helpers.aiohttp_client import async_get_clientsession
+from homeassistant.helpers.update_coordinator import DataUpdateCoordinator, UpdateFailed
 from homeassistant.util.dt import now
-from homeassistant.exceptions import IntegrationError
+from homeassistant.exceptions import ConfigEntryAuthFailed
 
 from .const import (
-    DOMAIN, API_BASE, _LOGGER,
-    sgmwnonce, sgmwappcode, sgmwappversion,
-    sgmwsystem, sgmwsystemversion
+    DOMAIN, API_BASE, OTHER_API_ENDPOINTS, READ_ONLY_APIS, CONTROL_API_PREFIX, _LOGGER,
+    API_RETRY_ATTEMPTS, API_RETRY_BASE_DELAY, API_RETRY_MAX_DELAY, API_EXCHANGE_HISTORY,
+    CONF_MQTT_TOPIC, ADVANCED_OPTIONS, STALE_UNAVAILABLE_AFTER,
+    IDLE_BACKOFF_AFTER, GEOCODE_PRECISION, GEOCODE_MIN_DISTANCE,
 )
-from .converters import get_value, Converter
+from .api import WulingApiClient, json_loads
+from .circuit import CircuitBreaker, STATE_CLOSED
+from .debug_log import get_debug_log_writer
+from .geocache import async_get_geocode_cache, geohash, distance
+from .geocoder import get_geocoder, get_position_converter, address_detail
+from .hub import AccountHub, async_acquire_hub, async_release_hub
+from .push import MqttPush
+from .region import async_get_region_index
+from .converters import Converter, PathTable
+from .ratelimit import get_rate_limiter, PRIORITY_CONTROL, PRIORITY_POLL
+from .scheduler import EndpointScheduler, FixedCadence, DailyCadence, ConditionalCadence
+
+# 实体除订阅的属性外还依赖的数据，这些数据变化时同样需要推送到对应实体
+# 其中不在解码结果中的键直接从coordinator.data中比较
+EXTRA_DEPENDENCIES = {
+    'location': ('carInfo',),  # 位置实体附带carInfo中的基本信息
+    'address': ('gaode_address_detail',),  # 地址实体附带高德地址详情
+    'send_message_device': ('options',),  # 下拉框的选项列表
+}
+# 基本API返回的车辆数据，判断轮询是否有新数据时由collectTime单独比较
+VEHICLE_DATA_KEYS = ('carStatus', 'carInfo', 'basic_api_timestamp')
 
 
 class StateCoordinator(DataUpdateCoordinator):
@@ -36,12 +58,54 @@ class StateCoordinator(DataUpdateCoordinator):
             update_interval=timedelta(seconds=basic_refresh_rate),
         )
         self.entry = entry
+        # 相同账号凭据的所有配置条目共享的账号中心（API客户端、请求合并、状态查询并发限制）
+        self.hub: AccountHub = async_acquire_hub(hass, self.credentials)
         self.data = {}
         self.extra = {}
         self.entities = {}
+        self._subscribers = {}  # 属性 -> 订阅该属性的实体列表
+        self.payload = {}  # 最近一次解码结果，由async_update_listeners统一生成
+        self._last_payload = {}  # 上一次推送的解码结果，用于比较变化
+        self._last_sources = {}  # 上一次推送时的原始数据源
+        self.suppressed_writes = 0  # 因状态未变化而跳过的实体写入次数
+        self._freshness = None  # 上一次基本API数据的新鲜度标识（collectTime或数据哈希）
+        self._skip_dispatch = False  # 本次轮询没有新数据，跳过解码和分发
+        self._dispatched_local = None  # 上一次分发时协调器自己写入的数据的摘要
+        self.unchanged_polls = 0  # 连续没有新数据的轮询次数
+        self.skipped_dispatches = 0  # 因没有新数据而跳过的解码和分发次数
+        self._dispatched_success = True  # 上一次分发时的获取结果，变化时需要刷新所有实体的可用状态
+        self.snapshot = None  # 车辆数据快照存储，由async_setup_entry设置
         
         # 初始化刷新速率设置
         self.other_api_refresh_rate = entry.options.get('other_api_refresh_rate', 600)  # 默认10分钟
+        # 各其他API端点的独立刷新速率，未配置时为None，使用other_api_refresh_rate
+        self.endpoint_refresh_rates = {
+            api: entry.options.get(option) for api, option in OTHER_API_ENDPOINTS.items()
+        }
+        
+        # 其他API并发刷新的并发数和请求起始间隔（秒）
+        self.other_api_concurrency = entry.options.get('other_api_concurrency', ADVANCED_OPTIONS['other_api_concurrency'])
+        self.other_api_spacing = entry.options.get('other_api_spacing', ADVANCED_OPTIONS['other_api_spacing'])
+        self._other_api_semaphore = asyncio.Semaphore(max(1, int(self.other_api_concurrency)))
+        self._other_api_next_start = 0
+        
+        # 相同请求合并：进行中的请求共享同一次HTTP调用，只读接口的结果短时间内复用，由账号中心跨配置条目共享
+        self.request_cache_ttl = entry.options.get('request_cache_ttl', ADVANCED_OPTIONS['request_cache_ttl'])
+        self.rate_limit_wait = 0.0  # 本车辆请求在共享限流器中累计等待的秒数
+        
+        # 只读接口的熔断器和最后一次成功的响应，熔断或失败时返回标记为stale的旧数据
+        self._breakers = {api: CircuitBreaker() for api in READ_ONLY_APIS}
+        self._last_good_responses = {}
+        self._stale_apis = set()  # 最近一次请求失败、正在使用旧数据的端点
+        self._status_failing_since = None  # 车辆状态接口开始连续失败的时间（time.monotonic）
+        # 最近的API请求记录（端点、耗时、状态码、响应大小），供诊断信息下载，不写磁盘
+        self.api_exchanges = deque(maxlen=API_EXCHANGE_HISTORY)
+        
+        # MQTT推送：推送通道活跃时只在静默超时后轮询
+        self.push: MqttPush = None
+        self.push_active = False
+        self.last_push = 0
+        self.push_silence_timeout = entry.options.get('mqtt_silence_timeout', ADVANCED_OPTIONS['mqtt_silence_timeout'])
         
         # 初始化调试模式
         self.debug_mode = entry.options.get('debug_mode', False)
@@ -53,11 +117,7 @@ class StateCoordinator(DataUpdateCoordinator):
         # 当amap_key为空时，清空变量（设置为None）
         amap_key = entry.data.get('amap_key', '') or entry.options.get('amap_key', '')
         self.amap_key = amap_key if amap_key.strip() else None
-        
-        # 初始化最后检查时间
-        self.last_check_time = 0
-        self.last_tire_time = 0
-        self.last_yesterday_mileage_time = 0
+        self._geocode_position = None  # 上一次查询地址时的GCJ02坐标(纬度, 经度)
         
         # 初始化通知相关变量
         self.last_notification_time = time.time()  # 上次发送通知的时间戳，初始化为当前时间，避免启动时发送通知
@@ -75,9 +135,27 @@ class StateCoordinator(DataUpdateCoordinator):
         # 初始化转换器
         from .sensors_config import create_converters
         self.converters = create_converters()
+        # 父属性 -> 子属性列表，只在初始化时构建一次
+        self._childs = {}
+        for conv in self.converters:
+            if conv.parent:
+                self._childs.setdefault(conv.parent, []).append(conv.attr)
+        # 按转换器顺序保存预编译路径，解码时每个顶层分组（carStatus、tirePressure等）只取一次
+        self._paths = PathTable((conv, conv.path or conv.compile().path) for conv in self.converters)
+        # 实体平台 -> 需要创建实体的转换器，各平台设置时直接取用，带__internal_use标记的只参与解码
+        self.domain_converters = {}
+        for conv in self.converters:
+            if conv.option and conv.option.get('__internal_use'):
+                continue
+            self.domain_converters.setdefault(conv.domain, []).append(conv)
         
-        # 启动其他API的独立刷新任务
-        self._async_start_other_api_refresh()
+        # 启动其他API的独立调度任务，各端点按自己的节奏策略刷新
+        self.other_api_scheduler = EndpointScheduler(f'{self.name}-other-apis', self.async_update_other_apis)
+        self.other_api_scheduler.add('car/check/all', self.async_update_check, self._cadence_policy('car/check/all'))
+        self.other_api_scheduler.add('car/info/tire/pressure', self.async_update_tire, self._cadence_policy('car/info/tire/pressure'))
+        self.other_api_scheduler.add('car/yesterday/mileage', self.async_update_yesterday_mileage, self._cadence_policy('car/yesterday/mileage'))
+        self._key_on = None  # 上一次调度时的钥匙通电状态，变化时重新计算各端点节奏
+        # 调度任务在登记到账号中心并成为该车辆的主协调器后才启动，见async_become_leader
 
     @property
     def access_token(self):
@@ -91,6 +169,21 @@ class StateCoordinator(DataUpdateCoordinator):
     def client_secret(self):
         return self.entry.data.get(CONF_CLIENT_SECRET, '')
 
+    @property
+    def credentials(self):
+        return (self.access_token, self.client_id, self.client_secret)
+
+    @property
+    def api_client(self) -> WulingApiClient:
+        """账号中心的API客户端，凭据变化时切换到新凭据对应的账号中心"""
+        if self.hub.credentials != self.credentials:
+            old = self.hub
+            old.detach(self)
+            self.hub = async_acquire_hub(self.hass, self.credentials)
+            self.hub.attach(self)
+            self.hass.async_create_task(async_release_hub(self.hass, old))
+        return self.hub.client
+
     @property
     def car_info(self):
         return self.data.get('carInfo') or {}
@@ -129,194 +222,233 @@ class StateCoordinator(DataUpdateCoordinator):
         code = self.extra.get('errorCode')
         if code == '500009':
             msg = self.extra.get('errorMessage') or '登陆失效'
-            raise IntegrationError(msg)
+            raise ConfigEntryAuthFailed(msg)
 
-    def _async_start_other_api_refresh(self):
-        """启动其他API的独立刷新任务"""
-        import asyncio
-        
-        async def _refresh_other_apis():
-            """定期刷新其他API的任务"""
-            while True:
-                try:
-                    current_time = time.time()
-                    refresh_interval = self.other_api_refresh_rate
-                    
-                    # 检查是否到达刷新时间，或者首次运行时
-                    last_refresh_time = max(self.last_check_time, self.last_tire_time, self.last_yesterday_mileage_time)
-                    if current_time - last_refresh_time > refresh_interval:
-                      
-                        # 依次刷新每个API，间隔3秒
-                        
-                        # 刷新检查API
-                        self.last_check_time = current_time
-                        await self.async_update_check()
-                        await asyncio.sleep(3)
-                        # 刷新轮胎API
-                        self.last_tire_time = current_time
-                        await self.async_update_tire()
-                        await asyncio.sleep(3)
-                        # 刷新昨日里程API
-                        self.last_yesterday_mileage_time = current_time                            
-                        await self.async_update_yesterday_mileage()
-                        
-                        # 通知Home Assistant更新状态
-                        self.async_set_updated_data(self.data)
-                    
-                    # 等待1秒后再次检查
-                    await asyncio.sleep(1)
-                except Exception as e:
-                    _LOGGER.error('Error in other APIs refresh task: %s', e)
-                    # 出现错误时等待5秒后重试
-                    await asyncio.sleep(5)
-        
-        # 取消现有的刷新任务（如果存在）
-        if hasattr(self, '_other_apis_refresh_task'):
-            self._other_apis_refresh_task.cancel()
-        
-        # 创建新的刷新任务
-        self._other_apis_refresh_task = asyncio.create_task(_refresh_other_apis())
-
-    def _wgs2gcj(self, lng, lat):
-        """将WGS84坐标转换为GCJ02坐标（高德地图坐标系）"""
-        earthR = 6378137
-        
-        def out_of_china(lat, lng):
-            """检查坐标是否在中国境外"""
-            return lng < 72.004 or lng > 137.8347 or lat < 0.8293 or lat > 55.8271
-        
-        def transform(lat, lng):
-            """坐标转换核心函数"""
-            ret = [0.0, 0.0]
-            dLat = transform_lat(lng - 105.0, lat - 35.0)
-            dLng = transform_lng(lng - 105.0, lat - 35.0)
-            radLat = lat / 180.0 * 3.141592653589793
-            magic = 1 - 0.006693421622965943 * (radLat * radLat)
-            sqrtMagic = pow(magic, 0.5)
-            ret[0] = (dLat * 180.0) / ((earthR * (1 - 0.006693421622965943) / (magic * sqrtMagic) * 3.141592653589793))
-            ret[1] = (dLng * 180.0) / (earthR / sqrtMagic * cos(radLat) * 3.141592653589793)
-            return ret
-        
-        def transform_lat(x, y):
-            """计算纬度转换偏移量"""
-            ret = -100.0 + 2.0 * x + 3.0 * y + 0.2 * y * y + 0.1 * x * y + 0.2 * sqrt(abs(x))
-            ret += (20.0 * sin(6.0 * x * 3.141592653589793) + 20.0 * sin(2.0 * x * 3.141592653589793)) * 2.0 / 3.0
-            ret += (20.0 * sin(y * 3.141592653589793) + 40.0 * sin(y / 3.0 * 3.141592653589793)) * 2.0 / 3.0
-            ret += (160.0 * sin(y / 12.0 * 3.141592653589793) + 320 * sin(y * 3.141592653589793 / 30.0)) * 2.0 / 3.0
-            return ret
-        
-        def transform_lng(x, y):
-            """计算经度转换偏移量"""
-            ret = 300.0 + x + 2.0 * y + 0.1 * x * x + 0.1 * x * y + 0.1 * sqrt(abs(x))
-            ret += (20.0 * sin(6.0 * x * 3.141592653589793) + 20.0 * sin(2.0 * x * 3.141592653589793)) * 2.0 / 3.0
-            ret += (20.0 * sin(x * 3.141592653589793) + 40.0 * sin(x / 3.0 * 3.141592653589793)) * 2.0 / 3.0
-            ret += (150.0 * sin(x / 12.0 * 3.141592653589793) + 300.0 * sin(x / 30.0 * 3.141592653589793)) * 2.0 / 3.0
-            return ret
-        
-        from math import cos, sin, sqrt, pow
-        
-        # 检查坐标是否在中国境外
-        if out_of_china(lat, lng):
-            return [lng, lat]
-        
-        # 计算转换偏移量
-        d = transform(lat, lng)
-        # 返回转换后的坐标
-        return [lng + d[1], lat + d[0]]
-    
-    async def _get_address_from_gaode(self, longitude, latitude):
-        """使用高德API将经纬度转换为地址名称"""
-        if not self.amap_key:
-            # 如果没有配置高德API密钥，直接返回空字符串
+    def get_endpoint_refresh_rate(self, api: str):
+        """获取其他API端点的刷新速率（秒）"""
+        return self.endpoint_refresh_rates.get(api) or self.other_api_refresh_rate
+
+    def other_rate_endpoints(self):
+        """按other_api_refresh_rate刷新的端点，不含单独设置了刷新速率和每天刷新一次的端点"""
+        return [
+            api for api, endpoint in self.other_api_scheduler.endpoints.items()
+            if not self.endpoint_refresh_rates.get(api) and not isinstance(endpoint.policy, DailyCadence)
+        ]
+
+    @property
+    def key_on(self):
+        """钥匙是否通电（keyStatus不为0）"""
+        return str(self.car_status.get('keyStatus', '0')) != '0'
+
+    def _cadence_policy(self, api: str):
+        """构建其他API端点的刷新节奏策略
+
+        用户为端点单独设置了刷新速率时按固定间隔刷新，否则：
+        - 昨日里程每天零点后刷新一次
+        - 轮胎只在钥匙通电时快速刷新，停车时按其他API刷新速率
+        - 车况检查行驶时按其他API刷新速率，停车时放慢
+        """
+        if self.endpoint_refresh_rates.get(api):
+            return FixedCadence(lambda: self.get_endpoint_refresh_rate(api))
+        if api == 'car/yesterday/mileage':
+            return DailyCadence(self.entry.options.get('yesterday_mileage_api_offset', ADVANCED_OPTIONS['yesterday_mileage_api_offset']))
+        if api == 'car/info/tire/pressure':
+            return ConditionalCadence(
+                lambda: self.key_on,
+                active=lambda: self.entry.options.get('tire_api_active_refresh_rate', ADVANCED_OPTIONS['tire_api_active_refresh_rate']),
+                idle=lambda: self.other_api_refresh_rate,
+            )
+        if api == 'car/check/all':
+            return ConditionalCadence(
+                lambda: self.key_on,
+                active=lambda: self.other_api_refresh_rate,
+                idle=lambda: self.entry.options.get('check_api_parked_refresh_rate', max(self.other_api_refresh_rate, 3600)),
+            )
+        return FixedCadence(lambda: self.other_api_refresh_rate)
+
+    async def async_shutdown(self) -> None:
+        """停止其他API的调度任务，并从账号中心注销，最后一个使用者关闭API连接池"""
+        await self.other_api_scheduler.stop()
+        if self.push:
+            self.push.async_stop()
+        self.hub.detach(self)
+        await async_release_hub(self.hass, self.hub)
+        await super().async_shutdown()
+
+    @callback
+    def async_become_leader(self):
+        """成为该车辆的主协调器：按设置的刷新速率轮询并启动其他API调度任务"""
+        self.update_interval = self.temp_update_interval or self.original_update_interval
+        self.other_api_scheduler.start()
+
+    @callback
+    def async_become_follower(self):
+        """成为从协调器：停止轮询，数据由主协调器同步"""
+        self.update_interval = None
+        self.hass.async_create_task(self.other_api_scheduler.stop())
+
+    @callback
+    def async_receive_shared(self, data: dict, success: bool = True, exception: Exception = None):
+        """接收主协调器同步的数据和获取结果，主协调器获取失败时从协调器的实体同样显示为不可用"""
+        self.data = dict(data)
+        self.last_update_success = success
+        self.last_exception = exception
+        self.async_publish()
+        # 车门和钥匙通知按各配置条目自己的设置发送
+        self.hass.async_create_task(self._async_handle_notifications(self.data))
+
+    @callback
+    def async_restore(self, data: dict):
+        """用快照数据预先填充，实体创建时直接显示上次的状态"""
+        self.data.update(data)
+        self.payload = self.decode(self.data)
+        self._key_on = self.key_on
+
+    async def async_start_push(self):
+        """配置了MQTT推送主题时订阅车辆状态推送"""
+        topic = self.entry.data.get(CONF_MQTT_TOPIC) or self.entry.options.get(CONF_MQTT_TOPIC)
+        if not topic or not topic.strip():
+            return
+        if not MqttPush.supported(self.car_info):
+            _LOGGER.warning('车辆 %s 的carInfo.supportMqtt为否，不订阅推送主题，继续轮询', self.vin_sort)
+            return
+        push = MqttPush(self.hass, self, topic.strip())
+        if await push.async_start():
+            self.push = push
+
+    @callback
+    def async_handle_push(self, data: dict):
+        """处理推送的车辆状态，与轮询数据走同样的解码和分发流程"""
+        # 从协调器的数据由主协调器同步
+        if not self.hub.is_leader(self):
+            return
+        # 推送期间只在静默超时后轮询，但不比设置的刷新速率更频繁；async_set_updated_data会按新的间隔重新计时
+        interval = max(self.original_update_interval, timedelta(seconds=self.push_silence_timeout))
+        if not self.push_active:
+            _LOGGER.info('车辆 %s 推送通道已连通，轮询间隔放宽到 %s 秒', self.vin_sort, interval.total_seconds())
+        self.push_active = True
+        self.last_push = time.time()
+        self.update_interval = interval
+        # 推送消息可能只包含变化的字段，按分组合并而不是整体替换
+        for key, value in data.items():
+            current = self.data.get(key)
+            if isinstance(value, dict) and isinstance(current, dict):
+                self.data[key] = {**current, **value}
+            else:
+                self.data[key] = value
+        self._check_key_on_change()
+        self.async_set_updated_data(self.data)
+        self.hass.async_create_task(self._async_handle_notifications(self.data))
+
+    def _check_key_on_change(self):
+        """钥匙通电状态变化时，按新的状态重新计算其他API的刷新节奏"""
+        if self._key_on is not None and self._key_on != self.key_on:
+            self.other_api_scheduler.reschedule(immediately=False)
+        self._key_on = self.key_on
+
+    async def _async_handle_notifications(self, data: dict):
+        await self._handle_door_notification(data)
+        await self._handle_key_status_notification(data)
+
+    async def async_update_other_apis(self, updaters):
+        """在并发数和请求间隔限制下并发刷新多个API，完成后只发布一次更新"""
+        loop = asyncio.get_running_loop()
+
+        async def _run(updater):
+            async with self._other_api_semaphore:
+                # 按配置的最小间隔错开各请求的起始时间
+                start = max(loop.time(), self._other_api_next_start)
+                self._other_api_next_start = start + self.other_api_spacing
+                delay = start - loop.time()
+                if delay > 0:
+                    await asyncio.sleep(delay)
+                return await updater()
+
+        results = await asyncio.gather(*[_run(updater) for updater in updaters], return_exceptions=True)
+        for updater, result in zip(updaters, results):
+            if isinstance(result, Exception):
+                _LOGGER.error('Error in %s: %s', updater.__name__, result)
+
+        # 通知Home Assistant更新状态，车辆状态接口失败时实体仍保持不可用
+        self.async_publish()
+        return results
+
+    def _region_address(self, region):
+        """使用离线查询到的行政区作为地址，地址详情中只有省、市、区县和行政区划代码"""
+        if not region:
             return ""
-        
+        formatted_address = f"{region['province']}{region['city']}{region['district']}"
+        self.data['gaode_address_detail'] = address_detail(
+            {'formatted_address': formatted_address, 'addressComponent': dict(region)}, {},
+        )
+        return formatted_address
+    
+    async def _get_address_from_gaode(self, longitude, latitude, force=False):
+        """将经纬度转换为地址名称
+
+        有离线行政区划数据时先在本地查询省、市、区县；只有配置了高德API密钥时才调用高德API获取街道级地址，
+        未配置密钥或调用失败时以离线查询到的省市区县作为地址。
+        车辆移动不足GEOCODE_MIN_DISTANCE米时沿用上次的地址；所在geohash格子已有缓存时直接使用缓存，
+        force为True（手动刷新）时跳过这两项检查。
+        """
+        region = None
         try:
             # 记录原始坐标
             raw_lng, raw_lat = float(longitude), float(latitude)
             
-            # 将WGS84坐标转换为GCJ02坐标（高德API使用GCJ02坐标系）
-            gcj_lng, gcj_lat = self._wgs2gcj(raw_lng, raw_lat)
+            # 将WGS84坐标转换为GCJ02坐标（高德API和离线行政区划数据都使用GCJ02坐标系），与其他车辆同时提交的坐标一起批量转换
+            gcj_lng, gcj_lat = await get_position_converter(self.hass).async_convert(raw_lng, raw_lat)
             
-            # 构建高德API请求URL
-            # 逆地理编码API：https://restapi.amap.com/v3/geocode/regeo
-            url = f"https://restapi.amap.com/v3/geocode/regeo?output=json&key={self.amap_key}&location={gcj_lng},{gcj_lat}"
+            region_index = await async_get_region_index(self.hass)
+            if region_index:
+                region = region_index.lookup(gcj_lng, gcj_lat)
+            if not self.amap_key:
+                # 没有配置高德API密钥，只提供离线查询到的行政区
+                return self._region_address(region)
             
-            # 发送请求
-            import aiohttp
-            async with aiohttp.ClientSession() as session:
-                # 记录请求前的详细信息
-                request_info = {
-                    "请求URL": url,
-                    "原始WGS84坐标": f"{raw_lng},{raw_lat}",
-                    "转换后GCJ02坐标": f"{gcj_lng},{gcj_lat}",
-                    "请求时间": time.strftime('%Y-%m-%d %H:%M:%S')
-                }
-                
-                # 发送请求并记录HTTP头部
-                async with session.get(url, timeout=aiohttp.ClientTimeout(total=10)) as response:
-                    # 记录响应状态和头部信息
-                    response_headers = dict(response.headers)
-                    response_status = response.status
-                    
-                    # 记录完整的请求和响应信息到调试日志
-                    await self._write_debug_log(
-                        "高德API请求详情:",
-                        f"请求URL: {url}",
-                        f"原始WGS84坐标: {raw_lng},{raw_lat}",
-                        f"转换后GCJ02坐标: {gcj_lng},{gcj_lat}",
-                        f"请求方法: GET",
-                        f"响应状态码: {response_status}",
-                        f"响应头部: {json.dumps(response_headers, ensure_ascii=False, indent=2)}"
-                    )
-                    
-                    if response_status != 200:
-                        error_msg = f"高德API请求失败，状态码: {response_status}"
-                        _LOGGER.error(error_msg)
-                        await self._write_debug_log(error_msg)
-                        return ""
-                    
-                    # 获取响应内容
-                    response_text = await response.text()
-                    result = await response.json()
-                    
-                    # 记录完整的响应数据
-                    await self._write_debug_log(
-                        "高德API响应详情:",
-                        f"原始响应内容: {response_text}",
-                        f"解析后响应: {json.dumps(result, ensure_ascii=False, indent=2)}"
-                    )
-                    
-                    # 检查API返回状态
-                    if result.get('status') != '1':
-                        error_msg = f"高德API返回错误: {result.get('info')}"
-                        _LOGGER.error(error_msg)
-                        await self._write_debug_log(error_msg)
-                        return ""
-                    
-                    # 解析地址信息
-                    regeocode = result.get('regeocode', {})
-                    formatted_address = regeocode.get('formatted_address', '')
-                    
-                    # 保存完整的高德API响应到data中，用于地址传感器的属性
-                    self.data['gaode_address_detail'] = {
-                        'full_result': result,
-                        'regeocode': regeocode,
-                        'formatted_address': formatted_address,
-                        'province': regeocode.get('addressComponent', {}).get('province', ''),
-                        'city': regeocode.get('addressComponent', {}).get('city', ''),
-                        'district': regeocode.get('addressComponent', {}).get('district', ''),
-                        'township': regeocode.get('addressComponent', {}).get('township', ''),
-                        'street': regeocode.get('addressComponent', {}).get('streetNumber', {}).get('street', ''),
-                        'number': regeocode.get('addressComponent', {}).get('streetNumber', {}).get('number', ''),
-                        'adcode': regeocode.get('addressComponent', {}).get('adcode', ''),
-                        'citycode': regeocode.get('addressComponent', {}).get('citycode', ''),
-                        'towncode': regeocode.get('addressComponent', {}).get('towncode', ''),
-                        'distance': regeocode.get('addressComponent', {}).get('streetNumber', {}).get('distance', ''),
-                        'direction': regeocode.get('addressComponent', {}).get('streetNumber', {}).get('direction', ''),
-                    }
-                    
-                    await self._write_debug_log(f"解析得到的地址: {formatted_address}")
-                    return formatted_address
+            # 移动距离过滤：等红灯、堵车时不重复查询
+            last = self._geocode_position
+            if (not force and last and self.data.get('address')
+                    and distance(last[0], last[1], gcj_lat, gcj_lng) < GEOCODE_MIN_DISTANCE):
+                return self.data['address']
+            
+            # 按坐标所在格子查询缓存
+            cache = await async_get_geocode_cache(self.hass)
+            cell = geohash(gcj_lat, gcj_lng, GEOCODE_PRECISION)
+            cached = None if force else cache.get(cell)
+            if cached:
+                self._geocode_position = (gcj_lat, gcj_lng)
+                self.data['gaode_address_detail'] = cached[1]
+                return cached[0]
+            
+            # 与其他车辆的查询合并为一次批量请求，通过Home Assistant共享的长连接会话发送
+            result = await get_geocoder(self.hass, self.amap_key).async_regeo(gcj_lng, gcj_lat)
+            
+            # 记录完整的响应数据
+            if self.debug_mode:
+                await self._write_debug_log(
+                    "高德API响应详情:",
+                    f"原始WGS84坐标: {raw_lng},{raw_lat}",
+                    f"转换后GCJ02坐标: {gcj_lng},{gcj_lat}",
+                    f"解析后响应: {json.dumps(result, ensure_ascii=False, indent=2)}"
+                )
+            
+            # 解析地址信息
+            regeocode = result['regeocode']
+            formatted_address = regeocode.get('formatted_address', '')
+            if not isinstance(formatted_address, str):
+                # 高德在没有地址时返回空列表
+                formatted_address = ''
+            
+            # 保存完整的高德API响应到data中，用于地址传感器的属性
+            self.data['gaode_address_detail'] = address_detail(regeocode, result)
+            
+            self._geocode_position = (gcj_lat, gcj_lng)
+            if formatted_address:
+                cache.put(cell, formatted_address, self.data['gaode_address_detail'])
+            
+            await self._write_debug_log(f"解析得到的地址: {formatted_address}")
+            return formatted_address
         except Exception as e:
             error_msg = f"调用高德API时出错: {e}"
             _LOGGER.error(error_msg)
@@ -324,18 +456,24 @@ class StateCoordinator(DataUpdateCoordinator):
             # 记录异常堆栈信息
             import traceback
             await self._write_debug_log(f"异常堆栈: {traceback.format_exc()}")
-            return ""
+            # 高德API不可用时退回到离线查询到的行政区
+            return self._region_address(region)
     
     async def _async_update_data(self):
-        result = await self.async_request('userCarRelation/queryDefaultCarStatus')
+        api = 'userCarRelation/queryDefaultCarStatus'
+        result = await self.async_request(api)
+        if not result or result.get('stale'):
+            return self._stale_update(api)
+        self._status_failing_since = None
         data = result.pop('data', None) or {}
+        fresh = self._check_freshness(data)
         self.data.update(data)
         self.extra = result
         # 保存基本API的systemTimeMillis
         if 'systemTimeMillis' in result:
             self.data['basic_api_timestamp'] = result['systemTimeMillis']
         
-        # 获取地址名称（使用高德API进行逆地理编码）
+        # 获取地址名称（离线行政区划查询，配置了密钥时使用高德API进行逆地理编码）
         car_status = data.get('carStatus', {})
         longitude = car_status.get('longitude', '')
         latitude = car_status.get('latitude', '')
@@ -385,13 +523,81 @@ class StateCoordinator(DataUpdateCoordinator):
         # 处理钥匙状态变化通知
         await self._handle_key_status_notification(data)
         
+        # 推送通道静默超时，恢复正常轮询
+        if self.push_active and time.time() - self.last_push >= self.push_silence_timeout:
+            _LOGGER.warning('车辆 %s 推送通道静默超过 %s 秒，恢复轮询', self.vin_sort, self.push_silence_timeout)
+            self.push_active = False
+            self.update_interval = self.temp_update_interval or self.original_update_interval
+        
         # 处理动态刷新速率调整
         await self._handle_dynamic_refresh_rate(data)
         
+        # 钥匙通电状态变化时，按新的状态重新计算其他API的刷新节奏
+        self._check_key_on_change()
+        
+        # 车辆熄火且持续没有新数据时放慢轮询
+        self._apply_idle_backoff()
+        
+        # 车辆没有上传新数据，且熔断状态、通知时间、地址等协调器写入的数据也没有变化时，跳过本次解码和分发
+        self._skip_dispatch = not fresh and bool(self.payload) and self._local_digest() == self._dispatched_local
+        return self.data
+    
+    def _stale_update(self, api: str):
+        """车辆状态接口请求失败或熔断时保留最后一次成功的数据，实体保持可用，由api_stale和熔断状态实体显示数据已过期
+
+        没有旧数据，或接口已熔断且持续失败超过STALE_UNAVAILABLE_AFTER秒时，实体显示为不可用。
+        """
+        now = time.monotonic()
+        if self._status_failing_since is None:
+            self._status_failing_since = now
+        state = self._breakers[api].state if api in self._breakers else STATE_CLOSED
+        failing = now - self._status_failing_since
+        if not self.data.get('carStatus') or (state != STATE_CLOSED and failing >= STALE_UNAVAILABLE_AFTER):
+            self._skip_dispatch = False
+            raise UpdateFailed(f'车辆状态接口 {api} 已连续失败 {failing:.0f} 秒（熔断状态: {state}）')
+        _LOGGER.debug('车辆状态接口 %s 请求失败（熔断状态: %s），暂时使用旧数据', api, state)
+        # 只在熔断状态或过期端点变化时分发
+        self._skip_dispatch = bool(self.payload) and self._local_digest() == self._dispatched_local
         return self.data
+
+    def _check_freshness(self, data: dict) -> bool:
+        """根据carStatus.collectTime（没有时用数据哈希）判断车辆是否上传了新数据"""
+        collect_time = (data.get('carStatus') or {}).get('collectTime')
+        if collect_time:
+            freshness = ('collectTime', collect_time)
+        else:
+            digest = hashlib.md5(json.dumps(data, sort_keys=True, default=str).encode()).hexdigest()
+            freshness = ('hash', digest)
+        fresh = freshness != self._freshness
+        self._freshness = freshness
+        self.unchanged_polls = 0 if fresh else self.unchanged_polls + 1
+        return fresh
+    
+    def _local_digest(self) -> str:
+        """coordinator.data中车辆数据以外部分（协调器和其他API写入）的摘要"""
+        local = {key: val for key, val in self.data.items() if key not in VEHICLE_DATA_KEYS}
+        return hashlib.md5(json.dumps(local, sort_keys=True, default=str).encode()).hexdigest()
+    
+    def _apply_idle_backoff(self):
+        """熄火后连续IDLE_BACKOFF_AFTER次轮询没有新数据时，轮询间隔逐次翻倍，最多放慢到idle_max_refresh_rate秒"""
+        # 从协调器不轮询；推送期间和动态加速期间由各自的逻辑控制刷新间隔
+        if not self.hub.is_leader(self) or self.push_active or self.temp_update_interval is not None:
+            return
+        base = self.original_update_interval
+        interval = base
+        if not self.key_on and self.unchanged_polls >= IDLE_BACKOFF_AFTER:
+            steps = min(self.unchanged_polls - IDLE_BACKOFF_AFTER + 1, 10)
+            max_interval = timedelta(seconds=self.entry.options.get('idle_max_refresh_rate', ADVANCED_OPTIONS['idle_max_refresh_rate']))
+            interval = max(base, min(base * 2 ** steps, max_interval))
+        if self.update_interval != interval:
+            _LOGGER.debug('车辆 %s 轮询间隔调整为 %s 秒', self.vin_sort, interval.total_seconds())
+            self.update_interval = interval
     
     async def _handle_dynamic_refresh_rate(self, data):
         """处理动态刷新速率调整逻辑"""
+        # 从协调器不轮询，刷新速率由主协调器调整；推送通道活跃时不需要加快轮询
+        if not self.hub.is_leader(self) or self.push_active:
+            return
         # 获取当前状态
         car_status = data.get('carStatus', {})
         key_status = car_status.get('keyStatus', '')
@@ -718,12 +924,12 @@ class StateCoordinator(DataUpdateCoordinator):
                 _LOGGER.info("满足调用条件，开始调用高德API")
                 await self._write_debug_log("满足调用条件，开始调用高德API")
                 
-                address = await self._get_address_from_gaode(longitude, latitude)
+                address = await self._get_address_from_gaode(longitude, latitude, force=True)
                 # 将地址添加到data中，以便location实体使用
                 if address:
                     self.data['address'] = address
                     # 发送状态更新通知
-                    self.async_set_updated_data(self.data)
+                    self.async_publish()
                     _LOGGER.info(f"手动刷新地址成功，获取到地址：{address}")
                     await self._write_debug_log(f"手动刷新地址成功，获取到地址：{address}")
                     
@@ -734,7 +940,7 @@ class StateCoordinator(DataUpdateCoordinator):
                     return True
                 else:
                     _LOGGER.warning("手动刷新地址：未获取到有效地址")
-                    self._write_debug_log("手动刷新地址：未获取到有效地址")
+                    await self._write_debug_log("手动刷新地址：未获取到有效地址")
                     
                     # 恢复原始debug_mode状态
                     if 'original_debug_mode' in locals():
@@ -743,7 +949,7 @@ class StateCoordinator(DataUpdateCoordinator):
                     return False
             except Exception as e:
                 _LOGGER.error(f"手动刷新地址时出错: {e}")
-                self._write_debug_log(f"手动刷新地址时出错: {e}")
+                await self._write_debug_log(f"手动刷新地址时出错: {e}")
                 
                 # 恢复原始debug_mode状态
                 if 'original_debug_mode' in locals():
@@ -757,7 +963,7 @@ class StateCoordinator(DataUpdateCoordinator):
             _LOGGER.warning(f"  - 纬度: {latitude_str}")
             _LOGGER.warning(f"  - 钥匙状态: {key_status}")
             
-            self._write_debug_log(
+            await self._write_debug_log(
                 "手动刷新地址：不满足调用条件",
                 f"  - 经度: {longitude_str}",
                 f"  - 纬度: {latitude_str}",
@@ -771,171 +977,290 @@ class StateCoordinator(DataUpdateCoordinator):
             return False
 
     async def async_request(self, api: str, **kwargs):
+        """发送API请求
+
+        API路径和请求体相同的进行中请求共享同一次HTTP调用和结果，
+        只读接口的结果在request_cache_ttl秒内直接复用；相同账号的所有配置条目通过账号中心共享。
+        """
+        key = self._request_key(api, kwargs)
+        loop = asyncio.get_running_loop()
+        inflight, cache = self.hub.inflight_requests, self.hub.response_cache
+        cached = cache.get(key)
+        if cached and cached[0] > loop.time():
+            return dict(cached[1])
+
+        task = inflight.get(key)
+        if task is None:
+            task = asyncio.ensure_future(self._async_request(api, **kwargs))
+            inflight[key] = task
+
+            def _done(fut):
+                inflight.pop(key, None)
+                if fut.cancelled() or fut.exception() is not None:
+                    return
+                result = fut.result()
+                # 失败时返回的旧数据（stale）不缓存，后续调用方重新请求
+                if api in READ_ONLY_APIS and self.request_cache_ttl and result and not result.get('stale'):
+                    now = loop.time()
+                    for k in [k for k, v in cache.items() if v[0] <= now]:
+                        del cache[k]
+                    cache[key] = (now + self.request_cache_ttl, result)
+            task.add_done_callback(_done)
+        else:
+            _LOGGER.debug('合并重复请求: %s', api)
+
+        # 调用方会修改返回的字典（如pop('data')），因此每个调用方拿到各自的浅拷贝
+        result = await asyncio.shield(task)
+        return dict(result)
+
+    @staticmethod
+    def _request_key(api: str, kwargs: dict):
+        """根据请求方法、API路径、请求体和额外头部生成请求合并的键"""
+        body = kwargs.get('json', kwargs.get('data'))
+        return (
+            kwargs.get('method', 'POST'),
+            kwargs.get('url') or api.lstrip('/'),
+            json.dumps(body, sort_keys=True, ensure_ascii=False, default=str),
+            json.dumps(kwargs.get('headers'), sort_keys=True, default=str),
+        )
+
+    async def _async_request(self, api: str, **kwargs):
+        """只读接口失败时按指数退避加随机抖动重试，并通过熔断器保护失败的端点"""
+        breaker = self._breakers.get(api)
+        if breaker is None:
+            # 控制指令不重试，避免重复执行
+            return await self._async_request_once(api, **kwargs) or {}
+
+        if not breaker.allow():
+            _LOGGER.debug('Request %s skipped, circuit open', api)
+            return self._stale_response(api)
+
+        for attempt in range(API_RETRY_ATTEMPTS):
+            if attempt:
+                delay = min(API_RETRY_MAX_DELAY, API_RETRY_BASE_DELAY * 2 ** (attempt - 1))
+                await asyncio.sleep(delay * random.uniform(0.5, 1.5))
+            result = await self._async_request_once(api, **kwargs)
+            if result is not None:
+                breaker.record_success()
+                self._last_good_responses[api] = result
+                self._stale_apis.discard(api)
+                self._update_circuit_state()
+                return result
+
+        breaker.record_failure()
+        self._update_circuit_state()
+        if breaker.state != STATE_CLOSED:
+            _LOGGER.warning('Request %s failed %s times, circuit %s', api, breaker.failures, breaker.state)
+        return self._stale_response(api)
+
+    def _stale_response(self, api: str):
+        """返回端点最后一次成功的响应，并标记为stale"""
+        self._stale_apis.add(api)
+        self._update_circuit_state()
+        result = self._last_good_responses.get(api)
+        if not result:
+            return {}
+        return {**result, 'stale': True}
+
+    def _update_circuit_state(self):
+        """保存各端点熔断状态和正在使用旧数据的端点，供诊断实体显示"""
+        self.data['api_circuit'] = {api: breaker.state for api, breaker in self._breakers.items()}
+        self.data['api_stale'] = sorted(self._stale_apis)
+
+    async def _async_request_once(self, api: str, **kwargs):
+        """发送一次请求，失败时返回None"""
+        # 同一主机和账号的所有配置条目共享限流器，控制指令优先
+        limiter = get_rate_limiter(self.hass, kwargs.get('url') or API_BASE, self.access_token, self.client_id)
+        priority = PRIORITY_CONTROL if api.lstrip('/').startswith(CONTROL_API_PREFIX) else PRIORITY_POLL
+        wait = await limiter.acquire(priority)
+        if wait:
+            self.rate_limit_wait += wait
+            _LOGGER.debug('Request %s waited %.3fs for rate limiter', api, wait)
+
+        client = self.api_client
         timestamp = int(time.time() * 1000)
-        url = kwargs.setdefault('url', f'{API_BASE}/{api.lstrip("/")}')
-        kwargs.setdefault('method', 'POST')
-        
-        headers = {
-            'Accept': 'application/json',
-            'Content-Type': 'application/json; charset=UTF-8',
-            'User-Agent': 'okhttp/4.9.0',
-            'channel': 'linglingbang',
-            'platformNo': 'Android',
-            'appVersionCode': '1677',
-            'version': 'V8.2.10',
-            'imei': 'a-c62b2f538bf34758',
-            'imsi': 'unknown',
-            'deviceModel': 'MI 8',
-            'deviceBrand': 'Xiaomi',
-            'deviceType': 'Android',
-            'accessChannel': '1',
-            'sgmwaccesstoken': self.access_token,
-            'sgmwtimestamp': str(timestamp),
-            'sgmwnonce': sgmwnonce,
-            'sgmwclientid': self.client_id,
-            'sgmwclientsecret': self.client_secret,
-            'sgmwappcode': sgmwappcode,
-            'sgmwappversion': sgmwappversion,
-            'sgmwsystem': sgmwsystem,
-            'sgmwsystemversion': sgmwsystemversion,
-            'sgmwsignature': self.get_sign(timestamp, sgmwnonce),
-            **kwargs.pop('headers', {}),
-        }
+        url = kwargs.pop('url', None) or f'{API_BASE}/{api.lstrip("/")}'
+        method = kwargs.pop('method', 'POST')
+        headers = client.build_headers(timestamp, kwargs.pop('headers', None))
         kwargs['headers'] = headers
         
         # 获取请求数据
         request_data = kwargs.get('json', kwargs.get('data', {}))
         
+        started = time.monotonic()
         try:
-            res = await async_get_clientsession(self.hass).request(
-                **kwargs,
-                timeout=aiohttp.ClientTimeout(total=30),
-            )
+            status, text = await client.request(method, url, **kwargs)
         except Exception as err:
             _LOGGER.error('Request %s error: %s', api, err)
+            self._record_exchange(api, method, started, wait, error=repr(err))
             # 写入调试日志
-            await self._write_debug_log(
-                f"API调用失败: {url}", 
-                f"请求数据: {json.dumps(request_data, ensure_ascii=False, indent=2)}",
-                f"请求头部: {json.dumps(headers, ensure_ascii=False, indent=2)}",
-                f"错误信息: {err}"
-            )
-            return {}
-        text = await res.text() or ''
+            if self.debug_mode:
+                await self._write_debug_log(
+                    f"API调用失败: {url}", 
+                    f"请求数据: {json.dumps(request_data, ensure_ascii=False, indent=2)}",
+                    f"请求头部: {json.dumps(headers, ensure_ascii=False, indent=2)}",
+                    f"错误信息: {err}"
+                )
+            return None
+        if status >= 500:
+            _LOGGER.error('Response from %s error: HTTP %s', api, status)
+            self._record_exchange(api, method, started, wait, status, len(text))
+            # 写入调试日志
+            if self.debug_mode:
+                await self._write_debug_log(
+                    f"API服务端错误: {url}",
+                    f"状态码: {status}",
+                    f"响应内容: {text}"
+                )
+            return None
         try:
-            result = json.loads(text) or {}
+            result = json_loads(text) or {}
         except (TypeError, ValueError) as exc:
             _LOGGER.error('Response from %s error: %s', api, [exc, text])
+            self._record_exchange(api, method, started, wait, status, len(text), error=repr(exc))
             # 写入调试日志
+            if self.debug_mode:
+                await self._write_debug_log(
+                    f"API响应解析失败: {url}", 
+                    f"请求数据: {json.dumps(request_data, ensure_ascii=False, indent=2)}",
+                    f"请求头部: {json.dumps(headers, ensure_ascii=False, indent=2)}",
+                    f"响应内容: {text}", 
+                    f"错误信息: {exc}"
+                )
+            return None
+        self._record_exchange(api, method, started, wait, status, len(text), code=result.get('code') if isinstance(result, dict) else None)
+        
+        # 写入调试日志
+        if self.debug_mode:
             await self._write_debug_log(
-                f"API响应解析失败: {url}", 
+                f"API调用成功: {url}", 
                 f"请求数据: {json.dumps(request_data, ensure_ascii=False, indent=2)}",
                 f"请求头部: {json.dumps(headers, ensure_ascii=False, indent=2)}",
-                f"响应内容: {text}", 
-                f"错误信息: {exc}"
+                f"响应数据: {json.dumps(result, ensure_ascii=False, indent=2)}"
             )
-            return {}
-        
-        # 写入调试日志
-        await self._write_debug_log(
-            f"API调用成功: {url}", 
-            f"请求数据: {json.dumps(request_data, ensure_ascii=False, indent=2)}",
-            f"请求头部: {json.dumps(headers, ensure_ascii=False, indent=2)}",
-            f"响应数据: {json.dumps(result, ensure_ascii=False, indent=2)}"
-        )
         return result
         
+    def _record_exchange(self, api, method, started, wait, status=None, size=None, code=None, error=None):
+        """在环形缓冲区中记录一次请求，超出容量时自动丢弃最旧的记录"""
+        self.api_exchanges.append({
+            'time': now().isoformat(),
+            'api': api,
+            'method': method,
+            'status': status,
+            'code': code,
+            'size': size,
+            'elapsed': round(time.monotonic() - started, 3),
+            'rate_limit_wait': round(wait, 3),
+            'error': error,
+        })
+
     async def _write_debug_log(self, *messages):
-        """写入调试日志到文件"""
-        import os
-        from datetime import datetime
-        import asyncio
-        
-        # 记录调试模式检查过程
-        check_log = []
-        check_log.append(f"调试模式检查: 当前状态={self.debug_mode}")
-        
+        """写入调试日志到文件，由后台任务批量写入，不等待落盘"""
         # 只有当调试模式开启时才写入日志
         if not self.debug_mode:
-            # 写入调试模式关闭的记录到Home Assistant日志，方便调试
-            _LOGGER.debug('调试日志被跳过: 调试模式关闭')
             return
-        
-        # 调试日志文件路径
-        debug_file = os.path.join(self.hass.config.config_dir, 'custom_components', 'wuling', 'debug_log.txt')
-        check_log.append(f"调试日志路径: {debug_file}")
-        
-        # 格式化日志内容
-        timestamp = datetime.now().strftime('%Y-%m-%d %H:%M:%S.%f')[:-3]
-        log_lines = [f"[{timestamp}] {msg}" for msg in check_log + list(messages)]
-        log_content = '\n'.join(log_lines) + '\n\n'
-        
-        # 定义阻塞的文件操作函数
-        def _write_log_to_file():
-            """在单独线程中执行的阻塞文件操作"""
-            try:
-                # 创建日志目录（如果不存在）
-                os.makedirs(os.path.dirname(debug_file), exist_ok=True)
-                
-                # 写入日志文件
-                with open(debug_file, 'a', encoding='utf-8') as f:
-                    f.write(log_content)
-                return True
-            except Exception as e:
-                return e
-        
-        try:
-            # 在单独的线程中执行阻塞操作
-            result = await asyncio.get_running_loop().run_in_executor(None, _write_log_to_file)
-            
-            if result is True:
-                _LOGGER.debug('调试日志写入成功')
-            else:
-                _LOGGER.error('写入调试日志失败: %s', result)
-        except Exception as e:
-            _LOGGER.error('写入调试日志失败: %s', e)
-
-    def get_sign(self, timestamp, nonce):
-        # 计算签名
-        sign_str = (self.access_token +
-                    str(timestamp) +
-                    nonce +
-                    self.client_id +
-                    self.client_secret +
-                    sgmwappcode +
-                    sgmwappversion +
-                    sgmwsystem +
-                    sgmwsystemversion)
-        return hashlib.md5(sign_str.encode()).hexdigest().lower()
+        get_debug_log_writer(self.hass).write(*messages)
+
+    @callback
+    def async_set_updated_data(self, data) -> None:
+        """推送的数据总是需要分发"""
+        self._skip_dispatch = False
+        super().async_set_updated_data(data)
+
+    @callback
+    def async_publish(self) -> None:
+        """分发车辆状态接口之外的数据（其他API、手动刷新的地址）
+
+        与async_set_updated_data不同，不把获取结果改为成功，也不重新计时轮询，避免车辆状态接口失败期间实体可用状态反复切换。
+        """
+        self._skip_dispatch = False
+        self.async_update_listeners()
+
+    def async_update_listeners(self) -> None:
+        """每次数据更新只解码一次，并分发到所有实体；轮询没有新数据时直接跳过"""
+        if self._skip_dispatch:
+            self._skip_dispatch = False
+            self.skipped_dispatches += 1
+            return
+        self.payload = self.decode(self.data)
+        self._dispatched_local = self._local_digest()
+        # 获取成功与失败切换时实体的可用状态全部变化，需要写入所有实体
+        availability_changed = self.last_update_success != self._dispatched_success
+        self._dispatched_success = self.last_update_success
+        self.push_state(self.payload, force=availability_changed)
+        super().async_update_listeners()
+        # 状态有变化且获取成功时延迟保存快照
+        if self.snapshot and self.last_update_success and self.data.get('carInfo'):
+            self.snapshot.async_schedule_save()
+        # 同一辆车在其他配置条目中的从协调器同步本次数据
+        self.hub.async_share(self)
 
     def decode(self, data: dict) -> dict:
         """Decode props for HASS."""
         payload = {}
-        for conv in self.converters:
-            prop = conv.prop or conv.attr
-            value = get_value(data, prop, None)
+        for conv, value in self._paths.values(data):
             # 即使prop是None，也要调用decode方法，特别是对于SelectConv等特殊转换器
             conv.decode(self, payload, value)
         return payload
 
-    def push_state(self, value: dict):
-        """Push new state to Hass entities."""
+    def push_state(self, value: dict, force: bool = False):
+        """Push changed state to Hass entities, force为True时写入所有实体"""
         if not value:
             return
-        attrs = value.keys()
+        previous = self._last_payload
+        changed = {
+            attr for attr, val in value.items()
+            if attr not in previous or previous[attr] != val
+        }
+        sources = {
+            key: self.data.get(key)
+            for keys in EXTRA_DEPENDENCIES.values()
+            for key in keys
+            if key not in value
+        }
+        changed.update(
+            key for key, val in sources.items()
+            if key not in self._last_sources or self._last_sources[key] != val
+        )
+        self._last_payload = dict(value)
+        self._last_sources = sources
 
-        for entity in self.entities.values():
-            if not hasattr(entity, 'subscribed_attrs'):
-                continue
-            if not (entity.subscribed_attrs & attrs):
-                continue
+        # 通过倒排索引找出受影响的实体，开销只与变化的属性数量有关
+        targets = {}
+        if force:
+            targets = {id(entity): entity for entity in self.entities.values()}
+        for attr in changed:
+            for entity in self._subscribers.get(attr, ()):
+                targets[id(entity)] = entity
+        for entity in targets.values():
             entity.async_set_state(value)
             if entity.added:
                 entity.async_write_ha_state()
 
+        suppressed = len(self.entities) - len(targets)
+        if suppressed:
+            self.suppressed_writes += suppressed
+            _LOGGER.debug('跳过%s个未变化实体的状态写入，累计%s次', suppressed, self.suppressed_writes)
+
     def subscribe_attrs(self, conv: Converter):
         attrs = {conv.attr}
         if conv.childs:
             attrs |= set(conv.childs)
-        attrs.update(c.attr for c in self.converters if c.parent == conv.attr)
+        attrs.update(self._childs.get(conv.attr, ()))
         return attrs
+
+    def add_entity(self, entity):
+        """注册实体并加入属性订阅索引"""
+        self.remove_entity(entity.attr)
+        self.entities[entity.attr] = entity
+        for attr in entity.subscribed_attrs.union(EXTRA_DEPENDENCIES.get(entity.attr, ())):
+            self._subscribers.setdefault(attr, []).append(entity)
+
+    def remove_entity(self, attr: str):
+        """注销实体并从属性订阅索引中移除"""
+        entity = self.entities.pop(attr, None)
+        if entity is None:
+            return
+        for subscribers in self._subscribers.values():
+            if entity in subscribers:
+                subscribers.remove(entity)
@@ -0,0 +1,120 @@
+from math import cos, pi, sin, sqrt
+from typing import Sequence
+
+try:
+    # 有NumPy时整批坐标一次向量化计算，没有时逐点计算
+    import numpy as np
+except ImportError:
+    np = None
+
+# 克拉索夫斯基椭球长半轴和第一偏心率的平方（GCJ-02偏移算法使用的参数）
+EARTH_A = 6378137.0
+EARTH_EE = 0.006693421622965943
+# 逆转换的收敛精度（度，约0.01毫米）和最大迭代次数
+INVERSE_PRECISION = 1e-10
+INVERSE_MAX_ITERATIONS = 10
+
+
+def out_of_china(lng: float, lat: float) -> bool:
+    """坐标在中国境外时GCJ-02与WGS-84相同"""
+    return lng < 72.004 or lng > 137.8347 or lat < 0.8293 or lat > 55.8271
+
+
+def _offset(lng: float, lat: float) -> tuple:
+    """WGS-84坐标对应的GCJ-02偏移量（经度, 纬度）"""
+    x, y = lng - 105.0, lat - 35.0
+    d_lat = -100.0 + 2.0 * x + 3.0 * y + 0.2 * y * y + 0.1 * x * y + 0.2 * sqrt(abs(x))
+    d_lng = 300.0 + x + 2.0 * y + 0.1 * x * x + 0.1 * x * y + 0.1 * sqrt(abs(x))
+    common = (20.0 * sin(6.0 * x * pi) + 20.0 * sin(2.0 * x * pi)) * 2.0 / 3.0
+    d_lat += common
+    d_lng += common
+    d_lat += (20.0 * sin(y * pi) + 40.0 * sin(y / 3.0 * pi)) * 2.0 / 3.0
+    d_lat += (160.0 * sin(y / 12.0 * pi) + 320.0 * sin(y * pi / 30.0)) * 2.0 / 3.0
+    d_lng += (20.0 * sin(x * pi) + 40.0 * sin(x / 3.0 * pi)) * 2.0 / 3.0
+    d_lng += (150.0 * sin(x / 12.0 * pi) + 300.0 * sin(x / 30.0 * pi)) * 2.0 / 3.0
+    rad_lat = lat / 180.0 * pi
+    magic = 1 - EARTH_EE * sin(rad_lat) ** 2
+    sqrt_magic = sqrt(magic)
+    d_lat = (d_lat * 180.0) / ((EARTH_A * (1 - EARTH_EE)) / (magic * sqrt_magic) * pi)
+    d_lng = (d_lng * 180.0) / (EARTH_A / sqrt_magic * cos(rad_lat) * pi)
+    return d_lng, d_lat
+
+
+def wgs84_to_gcj02(lng: float, lat: float) -> tuple:
+    """将WGS-84坐标（车辆上报）转换为GCJ-02坐标（高德地图坐标系）"""
+    if out_of_china(lng, lat):
+        return lng, lat
+    d_lng, d_lat = _offset(lng, lat)
+    return lng + d_lng, lat + d_lat
+
+
+def gcj02_to_wgs84(lng: float, lat: float) -> tuple:
+    """将GCJ-02坐标迭代反算为WGS-84坐标，误差小于INVERSE_PRECISION度"""
+    if out_of_china(lng, lat):
+        return lng, lat
+    wgs_lng, wgs_lat = lng, lat
+    for _ in range(INVERSE_MAX_ITERATIONS):
+        gcj_lng, gcj_lat = wgs84_to_gcj02(wgs_lng, wgs_lat)
+        err_lng, err_lat = gcj_lng - lng, gcj_lat - lat
+        wgs_lng -= err_lng
+        wgs_lat -= err_lat
+        if abs(err_lng) < INVERSE_PRECISION and abs(err_lat) < INVERSE_PRECISION:
+            break
+    return wgs_lng, wgs_lat
+
+
+def _np_wgs84_to_gcj02(lng, lat):
+    x, y = lng - 105.0, lat - 35.0
+    sqrt_abs_x = np.sqrt(np.abs(x))
+    common = (20.0 * np.sin(6.0 * x * pi) + 20.0 * np.sin(2.0 * x * pi)) * 2.0 / 3.0
+    d_lat = -100.0 + 2.0 * x + 3.0 * y + 0.2 * y * y + 0.1 * x * y + 0.2 * sqrt_abs_x + common
+    d_lat += (20.0 * np.sin(y * pi) + 40.0 * np.sin(y / 3.0 * pi)) * 2.0 / 3.0
+    d_lat += (160.0 * np.sin(y / 12.0 * pi) + 320.0 * np.sin(y * pi / 30.0)) * 2.0 / 3.0
+    d_lng = 300.0 + x + 2.0 * y + 0.1 * x * x + 0.1 * x * y + 0.1 * sqrt_abs_x + common
+    d_lng += (20.0 * np.sin(x * pi) + 40.0 * np.sin(x / 3.0 * pi)) * 2.0 / 3.0
+    d_lng += (150.0 * np.sin(x / 12.0 * pi) + 300.0 * np.sin(x / 30.0 * pi)) * 2.0 / 3.0
+    rad_lat = lat / 180.0 * pi
+    magic = 1 - EARTH_EE * np.sin(rad_lat) ** 2
+    sqrt_magic = np.sqrt(magic)
+    d_lat = (d_lat * 180.0) / ((EARTH_A * (1 - EARTH_EE)) / (magic * sqrt_magic) * pi)
+    d_lng = (d_lng * 180.0) / (EARTH_A / sqrt_magic * np.cos(rad_lat) * pi)
+    outside = (lng < 72.004) | (lng > 137.8347) | (lat < 0.8293) | (lat > 55.8271)
+    return np.where(outside, lng, lng + d_lng), np.where(outside, lat, lat + d_lat)
+
+
+def _np_gcj02_to_wgs84(lng, lat):
+    wgs_lng, wgs_lat = lng.copy(), lat.copy()
+    for _ in range(INVERSE_MAX_ITERATIONS):
+        gcj_lng, gcj_lat = _np_wgs84_to_gcj02(wgs_lng, wgs_lat)
+        err_lng, err_lat = gcj_lng - lng, gcj_lat - lat
+        wgs_lng -= err_lng
+        wgs_lat -= err_lat
+        if np.abs(err_lng).max() < INVERSE_PRECISION and np.abs(err_lat).max() < INVERSE_PRECISION:
+            break
+    return wgs_lng, wgs_lat
+
+
+def _convert_many(points: Sequence, scalar, vectorized):
+    if np is None:
+        return [scalar(float(lng), float(lat)) for lng, lat in points]
+    array = np.asarray(points, dtype=float).reshape(-1, 2)
+    if not len(array):
+        return array if isinstance(points, np.ndarray) else []
+    lng, lat = vectorized(array[:, 0], array[:, 1])
+    result = np.column_stack((lng, lat))
+    if isinstance(points, np.ndarray):
+        return result
+    return [tuple(point) for point in result.tolist()]
+
+
+def wgs84_to_gcj02_many(points: Sequence):
+    """批量转换[(经度, 纬度), ...]，用于轨迹历史等多个坐标
+
+    传入NumPy数组（N×2）时返回NumPy数组，否则返回(经度, 纬度)元组列表。
+    """
+    return _convert_many(points, wgs84_to_gcj02, _np_wgs84_to_gcj02)
+
+
+def gcj02_to_wgs84_many(points: Sequence):
+    """批量反算[(经度, 纬度), ...]为WGS-84坐标，返回类型同wgs84_to_gcj02_many"""
+    return _convert_many(points, gcj02_to_wgs84, _np_gcj02_to_wgs84)
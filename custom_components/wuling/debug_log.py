@@ -0,0 +1,133 @@
+import asyncio
+import gzip
+import os
+import shutil
+from datetime import datetime
+from typing import Optional
+
+from homeassistant.const import EVENT_HOMEASSISTANT_STOP
+from homeassistant.core import HomeAssistant, Event
+
+from .const import (
+    DOMAIN, _LOGGER,
+    DEBUG_LOG_MAX_BYTES, DEBUG_LOG_BACKUP_COUNT, DEBUG_LOG_QUEUE_SIZE, DEBUG_LOG_BATCH_SIZE,
+)
+
+# 放入队列通知后台任务写完之前的日志后退出
+_STOP = object()
+
+
+class DebugLogWriter:
+    """后台批量写入的调试日志
+
+    日志行先放入有界队列，由单个后台任务批量取出，每批只提交一次线程池任务写文件；
+    文件超过max_bytes后压缩为debug_log.txt.1.gz并依次轮转，最多保留backup_count个备份。
+    磁盘过慢导致队列写满时丢弃新日志并计数，下一批写入时补记丢弃条数，内存占用始终有上限。
+    """
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        path: str,
+        max_bytes: int = DEBUG_LOG_MAX_BYTES,
+        backup_count: int = DEBUG_LOG_BACKUP_COUNT,
+        queue_size: int = DEBUG_LOG_QUEUE_SIZE,
+        batch_size: int = DEBUG_LOG_BATCH_SIZE,
+    ):
+        self.hass = hass
+        self.path = path
+        self.max_bytes = max_bytes
+        self.backup_count = backup_count
+        self.batch_size = batch_size
+        self._queue = asyncio.Queue(maxsize=queue_size)
+        self._task: Optional[asyncio.Task] = None
+        self.dropped = 0  # 累计丢弃的行数
+        self._pending_dropped = 0  # 尚未补记到文件中的丢弃行数
+
+    def write(self, *messages):
+        """追加一组日志行，不等待写入完成"""
+        timestamp = datetime.now().strftime('%Y-%m-%d %H:%M:%S.%f')[:-3]
+        content = '\n'.join(f"[{timestamp}] {msg}" for msg in messages) + '\n\n'
+        try:
+            self._queue.put_nowait(content)
+        except asyncio.QueueFull:
+            self.dropped += 1
+            self._pending_dropped += 1
+            return
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run(), name='wuling_debug_log')
+
+    async def close(self):
+        """写完队列中剩余的日志后停止后台任务
+
+        不取消后台任务，避免线程池中正在写入或轮转的文件被另一批写入同时操作；
+        而是放入停止标记，等待后台任务按顺序写完标记之前的日志后自行退出。
+        """
+        if self._task is None or self._task.done():
+            self._task = None
+            return
+        await self._queue.put(_STOP)
+        await self._task
+        self._task = None
+
+    def _drain(self) -> list:
+        batch = []
+        while len(batch) < self.batch_size:
+            try:
+                batch.append(self._queue.get_nowait())
+            except asyncio.QueueEmpty:
+                break
+        if self._pending_dropped:
+            timestamp = datetime.now().strftime('%Y-%m-%d %H:%M:%S.%f')[:-3]
+            batch.append(f"[{timestamp}] 调试日志队列已满，丢弃 {self._pending_dropped} 条日志\n\n")
+            self._pending_dropped = 0
+        return batch
+
+    async def _run(self):
+        while True:
+            first = await self._queue.get()
+            batch = [first] + self._drain()
+            stop = any(item is _STOP for item in batch)
+            batch = [item for item in batch if item is not _STOP]
+            if batch:
+                try:
+                    await self.hass.async_add_executor_job(self._write_batch, batch)
+                except Exception as exc:
+                    _LOGGER.error('写入调试日志失败: %s', exc)
+            if stop:
+                return
+
+    def _write_batch(self, batch: list):
+        """在线程池中执行：写入一批日志，必要时轮转"""
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        with open(self.path, 'a', encoding='utf-8') as f:
+            f.write(''.join(batch))
+            size = f.tell()
+        if size >= self.max_bytes:
+            self._rotate()
+
+    def _rotate(self):
+        """debug_log.txt -> debug_log.txt.1.gz，已有备份依次后移，超出数量的删除"""
+        for index in range(self.backup_count - 1, 0, -1):
+            src = f"{self.path}.{index}.gz"
+            if os.path.exists(src):
+                os.replace(src, f"{self.path}.{index + 1}.gz")
+        if self.backup_count > 0:
+            with open(self.path, 'rb') as src, gzip.open(f"{self.path}.1.gz", 'wb') as dst:
+                shutil.copyfileobj(src, dst)
+        os.remove(self.path)
+
+
+def get_debug_log_writer(hass: HomeAssistant) -> DebugLogWriter:
+    """获取所有配置项共享的调试日志写入器，Home Assistant停止时写完剩余日志"""
+    domain_data = hass.data.setdefault(DOMAIN, {})
+    writer = domain_data.get('debug_log_writer')
+    if writer is None:
+        path = os.path.join(hass.config.config_dir, 'custom_components', 'wuling', 'debug_log.txt')
+        writer = domain_data['debug_log_writer'] = DebugLogWriter(hass, path)
+
+        async def _async_close(event: Event):
+            await writer.close()
+
+        hass.bus.async_listen_once(EVENT_HOMEASSISTANT_STOP, _async_close)
+    return writer
@@ -0,0 +1,102 @@
+from typing import Any
+
+from homeassistant.components.diagnostics import async_redact_data, REDACTED
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.const import CONF_ACCESS_TOKEN, CONF_CLIENT_ID, CONF_CLIENT_SECRET
+from homeassistant.core import HomeAssistant
+
+from .const import DOMAIN, CONF_AMAP_KEY
+
+# 诊断信息中需要隐藏的账号凭据和车辆隐私字段
+TO_REDACT = {
+    CONF_ACCESS_TOKEN,
+    CONF_CLIENT_ID,
+    CONF_CLIENT_SECRET,
+    CONF_AMAP_KEY,
+    'vin',
+    'vinSort',
+    'latitude',
+    'longitude',
+    'address',
+    'gaode_address_detail',
+    'carNo',
+    'plateNo',
+    'carPlate',
+    'purchaseUserName',
+    'purchaseShopNum',
+    'userId',
+    'vsn',
+    'carInfoId',
+    'selected_mobile_device',
+    'send_message_device',
+    'mqtt_topic',
+}
+
+# carInfo中只保留车型相关字段，其余字段（包括接口以后新增的字段）一律隐藏
+CAR_INFO_FIELDS = {
+    'carName', 'carTypeName', 'carYear', 'model', 'seriesCode', 'colorName', 'colorCode',
+    'hasMoreCar', 'finishBind', 'isAuthIdentity',
+    'supportMqtt', 'supportHybridMileage', 'supportAutoAir',
+}
+
+
+async def async_get_config_entry_diagnostics(hass: HomeAssistant, entry: ConfigEntry) -> dict[str, Any]:
+    """下载配置项诊断信息：车辆最近的API请求记录、熔断和限流状态、端点调度情况"""
+    coordinator = hass.data.get(entry.entry_id, {}).get('coordinator')
+    geocode_cache = hass.data.get(DOMAIN, {}).get('geocode_cache')
+    region_index = hass.data.get(DOMAIN, {}).get('region_index')
+    position_converter = hass.data.get(DOMAIN, {}).get('position_converter')
+    return {
+        'entry': {
+            'data': async_redact_data(dict(entry.data), TO_REDACT),
+            'options': async_redact_data(dict(entry.options), TO_REDACT),
+        },
+        'vehicle': _coordinator_diagnostics(coordinator) if coordinator else None,
+        'geocode_cache': geocode_cache.stats() if geocode_cache else None,
+        'region_index': region_index.stats() if region_index else None,
+        'geocoders': [
+            {'requests': geocoder.requests, 'lookups': geocoder.lookups}
+            for geocoder in hass.data.get(DOMAIN, {}).get('geocoders', {}).values()
+        ],
+        'position_converter': (
+            {'batches': position_converter.batches, 'points': position_converter.points}
+            if position_converter else None
+        ),
+    }
+
+
+def _coordinator_diagnostics(coordinator) -> dict[str, Any]:
+    return {
+        'leader': coordinator.hub.is_leader(coordinator),
+        'hub_refs': coordinator.hub.refs,
+        'push': {
+            'subscribed': coordinator.push is not None,
+            'active': coordinator.push_active,
+            'last_push': coordinator.last_push,
+        },
+        'last_update_success': coordinator.last_update_success,
+        'update_interval': coordinator.update_interval.total_seconds() if coordinator.update_interval else None,
+        'api_circuit': coordinator.data.get('api_circuit'),
+        'api_stale': coordinator.data.get('api_stale'),
+        'rate_limit_wait': round(coordinator.rate_limit_wait, 3),
+        'suppressed_writes': coordinator.suppressed_writes,
+        'unchanged_polls': coordinator.unchanged_polls,
+        'skipped_dispatches': coordinator.skipped_dispatches,
+        'scheduler': {
+            name: {'last_run': endpoint.last_run, 'next_run': endpoint.next_run}
+            for name, endpoint in coordinator.other_api_scheduler.endpoints.items()
+        },
+        'api_exchanges': list(coordinator.api_exchanges),
+        'data': _redact_vehicle_data(coordinator.data),
+    }
+
+
+def _redact_vehicle_data(data: dict) -> dict:
+    redacted = async_redact_data(data, TO_REDACT)
+    car_info = redacted.get('carInfo')
+    if isinstance(car_info, dict):
+        redacted['carInfo'] = {
+            key: value if key in CAR_INFO_FIELDS else REDACTED
+            for key, value in car_info.items()
+        }
+    return redacted
@@ -73,12 +73,18 @@ class XEntity(CoordinatorEntity):
         self._attr_extra_state_attributes = {}
         self._vars = {}
         self.subscribed_attrs = coordinator.subscribe_attrs(conv)
-        coordinator.entities[conv.attr] = self
+        coordinator.add_entity(self)
 
     @property
     def vin(self):
         return self.coordinator.vin
 
+    @property
+    def available(self):
+        if self._option.get('always_available'):
+            return True
+        return super().available
+
     async def async_added_to_hass(self):
         """Run when entity about to be added to hass."""
         await super().async_added_to_hass()
@@ -90,19 +96,23 @@ class XEntity(CoordinatorEntity):
         self.update()
 
     def update(self):
-        """Update entity state from coordinator data."""
-        payload = self.coordinator.decode(self.coordinator.data)
-        self.coordinator.push_state(payload)
+        """Update entity state from the coordinator's last decoded payload."""
+        payload = self.coordinator.payload
+        if not payload:
+            return
+        self.async_set_state(payload)
+        self.async_write_ha_state()
 
     async def async_will_remove_from_hass(self):
         """Run when entity will be removed from hass."""
         await super().async_will_remove_from_hass()
-        if hasattr(self.coordinator, 'entities') and self.attr in self.coordinator.entities:
-            del self.coordinator.entities[self.attr]
+        if self.coordinator.entities.get(self.attr) is self:
+            self.coordinator.remove_entity(self.attr)
 
     def _handle_coordinator_update(self) -> None:
         """Handle updated data from the coordinator."""
-        self.update()
+        # 状态已由协调器在async_update_listeners中统一解码并推送，这里无需重复处理
+        return
 
     def async_set_state(self, state):
         """Set state."""
@@ -0,0 +1,161 @@
+import asyncio
+import time
+from collections import OrderedDict
+from math import asin, cos, radians, sin, sqrt
+from typing import Optional
+
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.storage import Store
+
+from .const import (
+    DOMAIN,
+    GEOCODE_CACHE_VERSION, GEOCODE_CACHE_SIZE, GEOCODE_CACHE_TTL, GEOCODE_CACHE_SAVE_DELAY,
+)
+
+_BASE32 = '0123456789bcdefghjkmnpqrstuvwxyz'
+EARTH_RADIUS = 6371000  # 地球平均半径（米）
+# 地址详情中不写入缓存的键：full_result是完整响应，与regeocode重复
+UNCACHED_DETAIL_KEYS = ('full_result',)
+
+
+def geohash(lat: float, lng: float, precision: int) -> str:
+    """计算坐标所在的geohash格子，精度7约为150米×150米"""
+    lat_range, lng_range = [-90.0, 90.0], [-180.0, 180.0]
+    chars = []
+    bits, bit_count, even = 0, 0, True
+    while len(chars) < precision:
+        if even:
+            mid = (lng_range[0] + lng_range[1]) / 2
+            if lng >= mid:
+                bits = (bits << 1) | 1
+                lng_range[0] = mid
+            else:
+                bits <<= 1
+                lng_range[1] = mid
+        else:
+            mid = (lat_range[0] + lat_range[1]) / 2
+            if lat >= mid:
+                bits = (bits << 1) | 1
+                lat_range[0] = mid
+            else:
+                bits <<= 1
+                lat_range[1] = mid
+        even = not even
+        bit_count += 1
+        if bit_count == 5:
+            chars.append(_BASE32[bits])
+            bits, bit_count = 0, 0
+    return ''.join(chars)
+
+
+def distance(lat1: float, lng1: float, lat2: float, lng2: float) -> float:
+    """两点间的球面距离（米）"""
+    dlat = radians(lat2 - lat1)
+    dlng = radians(lng2 - lng1)
+    a = sin(dlat / 2) ** 2 + cos(radians(lat1)) * cos(radians(lat2)) * sin(dlng / 2) ** 2
+    return 2 * EARTH_RADIUS * asin(sqrt(a))
+
+
+def _geocode_store(hass: HomeAssistant) -> Store:
+    return Store(hass, GEOCODE_CACHE_VERSION, f'{DOMAIN}.geocode_cache')
+
+
+def _strip_detail(detail: dict) -> dict:
+    if not isinstance(detail, dict):
+        return detail
+    return {key: val for key, val in detail.items() if key not in UNCACHED_DETAIL_KEYS}
+
+
+class GeocodeCache:
+    """逆地理编码结果缓存
+
+    以GCJ-02坐标所在的geohash格子为键，按最近使用顺序淘汰，超过有效期的结果视为未命中。
+    所有配置条目和车辆共享，并通过Home Assistant的存储延迟写入磁盘，重启后继续使用。
+    """
+
+    def __init__(self, hass: HomeAssistant, size: int = GEOCODE_CACHE_SIZE, ttl: float = GEOCODE_CACHE_TTL):
+        self.size = size
+        self.ttl = ttl
+        self._entries = OrderedDict()  # geohash -> [写入时间, 地址, 地址详情]
+        self._store = _geocode_store(hass)
+        self.hits = 0
+        self.misses = 0
+        self._save_pending = False
+
+    async def async_load(self):
+        stored = await self._store.async_load() or {}
+        now = time.time()
+        for key, entry in stored.get('entries', []):
+            if now - entry[0] < self.ttl:
+                self._entries[key] = [entry[0], entry[1], _strip_detail(entry[2])]
+        while len(self._entries) > self.size:
+            self._entries.popitem(last=False)
+
+    def get(self, key: str) -> Optional[tuple]:
+        """返回(地址, 地址详情)，未命中或已过期时返回None"""
+        entry = self._entries.get(key)
+        if entry is None or time.time() - entry[0] >= self.ttl:
+            if entry is not None:
+                del self._entries[key]
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return entry[1], entry[2]
+
+    @callback
+    def put(self, key: str, address: str, detail: dict):
+        self._entries[key] = [time.time(), address, _strip_detail(detail)]
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.size:
+            self._entries.popitem(last=False)
+        # 已有待写入的数据时不再调用，避免行驶中频繁写入缓存时一直推迟保存
+        if not self._save_pending:
+            self._save_pending = True
+            self._store.async_delay_save(self._data_to_save, GEOCODE_CACHE_SAVE_DELAY)
+
+    async def async_remove(self):
+        """清空缓存并删除磁盘上的缓存文件，同时取消待写入的保存"""
+        self._entries.clear()
+        self._save_pending = False
+        await self._store.async_remove()
+
+    def stats(self) -> dict:
+        return {'entries': len(self._entries), 'hits': self.hits, 'misses': self.misses}
+
+    @callback
+    def _data_to_save(self) -> dict:
+        self._save_pending = False
+        return {'entries': list(self._entries.items())}
+
+
+async def async_get_geocode_cache(hass: HomeAssistant) -> GeocodeCache:
+    """获取进程级共享的逆地理编码缓存，首次使用时从磁盘加载"""
+    domain_data = hass.data.setdefault(DOMAIN, {})
+    cache = domain_data.get('geocode_cache')
+    if cache is None:
+        # 多个协调器同时首次使用时只加载一次
+        loading = domain_data.get('geocode_cache_loading')
+        if loading is None:
+            async def _load():
+                new_cache = GeocodeCache(hass)
+                await new_cache.async_load()
+                domain_data['geocode_cache'] = new_cache
+                return new_cache
+            loading = domain_data['geocode_cache_loading'] = asyncio.ensure_future(_load())
+        cache = await loading
+        domain_data.pop('geocode_cache_loading', None)
+    return cache
+
+
+async def async_remove_geocode_cache(hass: HomeAssistant):
+    """删除逆地理编码缓存（包含车辆到过的位置和时间），最后一个配置条目删除时调用"""
+    domain_data = hass.data.get(DOMAIN, {})
+    loading = domain_data.get('geocode_cache_loading')
+    if loading is not None:
+        await loading
+    cache = domain_data.pop('geocode_cache', None)
+    if cache is not None:
+        await cache.async_remove()
+    else:
+        await _geocode_store(hass).async_remove()
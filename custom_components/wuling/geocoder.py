@@ -0,0 +1,166 @@
+import asyncio
+from typing import Optional
+
+import aiohttp
+
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers.aiohttp_client import async_get_clientsession
+
+from .api import json_loads
+from .const import DOMAIN, _LOGGER, GEOCODE_BATCH_WINDOW, GEOCODE_BATCH_SIZE
+from .coords import wgs84_to_gcj02_many
+
+# 逆地理编码API：https://restapi.amap.com/v3/geocode/regeo
+AMAP_REGEO_URL = 'https://restapi.amap.com/v3/geocode/regeo'
+AMAP_TIMEOUT = aiohttp.ClientTimeout(total=10)
+
+
+class AmapError(Exception):
+    """高德API请求失败"""
+
+
+def address_detail(regeocode: dict, full_result: dict) -> dict:
+    """整理地址详情，用于地址传感器的属性"""
+    component = regeocode.get('addressComponent') or {}
+    street_number = component.get('streetNumber') or {}
+    return {
+        'full_result': full_result,
+        'regeocode': regeocode,
+        'formatted_address': regeocode.get('formatted_address', ''),
+        'province': component.get('province', ''),
+        'city': component.get('city', ''),
+        'district': component.get('district', ''),
+        'township': component.get('township', ''),
+        'street': street_number.get('street', ''),
+        'number': street_number.get('number', ''),
+        'adcode': component.get('adcode', ''),
+        'citycode': component.get('citycode', ''),
+        'towncode': component.get('towncode', ''),
+        'distance': street_number.get('distance', ''),
+        'direction': street_number.get('direction', ''),
+    }
+
+
+class PositionConverter:
+    """将车辆上报的WGS-84坐标批量转换为GCJ-02坐标
+
+    同一轮事件循环中提交的坐标（如启动时各配置条目同时首次刷新）合并为一次wgs84_to_gcj02_many调用，
+    不额外等待。所有配置条目和车辆共享。
+    """
+
+    def __init__(self):
+        self._pending = []  # [((经度, 纬度), future)]
+        self.batches = 0  # 批量转换次数
+        self.points = 0  # 转换的坐标数
+
+    async def async_convert(self, lng: float, lat: float) -> tuple:
+        """返回GCJ-02坐标(经度, 纬度)"""
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        if not self._pending:
+            loop.call_soon(self._flush)
+        self._pending.append(((lng, lat), future))
+        return await future
+
+    def _flush(self):
+        batch, self._pending = self._pending, []
+        self.batches += 1
+        self.points += len(batch)
+        try:
+            converted = wgs84_to_gcj02_many([point for point, _ in batch])
+        except Exception as exc:
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(exc)
+            return
+        for (_, future), point in zip(batch, converted):
+            if not future.done():
+                future.set_result(point)
+
+
+class AmapBatchGeocoder:
+    """高德逆地理编码批量查询
+
+    各车辆的查询先进入等待队列，GEOCODE_BATCH_WINDOW秒内到达的查询（最多GEOCODE_BATCH_SIZE个）
+    合并为一次batch=true请求，结果按顺序分发给各自的调用方。同一个高德密钥的所有配置条目和车辆共享。
+    """
+
+    def __init__(self, hass: HomeAssistant, key: str):
+        self.hass = hass
+        self.key = key
+        self._pending = []  # [(location, future)]
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self.requests = 0  # 实际发出的HTTP请求数
+        self.lookups = 0  # 查询的坐标数
+
+    async def async_regeo(self, lng: float, lat: float) -> dict:
+        """查询GCJ02坐标的地址，返回{status, info, regeocode}，失败时抛出AmapError"""
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending.append((f'{lng:.6f},{lat:.6f}', future))
+        if len(self._pending) >= GEOCODE_BATCH_SIZE:
+            self._flush()
+        elif self._timer is None:
+            self._timer = loop.call_later(GEOCODE_BATCH_WINDOW, self._flush)
+        return await future
+
+    def _flush(self):
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        batch, self._pending = self._pending[:GEOCODE_BATCH_SIZE], self._pending[GEOCODE_BATCH_SIZE:]
+        if self._pending:
+            self._timer = asyncio.get_running_loop().call_later(GEOCODE_BATCH_WINDOW, self._flush)
+        if batch:
+            self.hass.async_create_task(self._async_request(batch))
+
+    async def _async_request(self, batch: list):
+        self.requests += 1
+        self.lookups += len(batch)
+        params = {
+            'output': 'json',
+            'key': self.key,
+            'location': '|'.join(location for location, _ in batch),
+            'batch': 'true',
+        }
+        try:
+            session = async_get_clientsession(self.hass)
+            async with session.get(AMAP_REGEO_URL, params=params, timeout=AMAP_TIMEOUT) as response:
+                if response.status != 200:
+                    raise AmapError(f'高德API请求失败，状态码: {response.status}')
+                result = json_loads(await response.text())
+            if result.get('status') != '1':
+                raise AmapError(f"高德API返回错误: {result.get('info')}")
+        except Exception as exc:
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(exc if isinstance(exc, AmapError) else AmapError(str(exc)))
+            return
+
+        regeocodes = result.get('regeocodes') or []
+        _LOGGER.debug('高德批量逆地理编码: %s 个坐标', len(batch))
+        for index, (_, future) in enumerate(batch):
+            if future.done():
+                continue
+            regeocode = regeocodes[index] if index < len(regeocodes) else {}
+            future.set_result({
+                'status': result.get('status'),
+                'info': result.get('info'),
+                'regeocode': regeocode or {},
+            })
+
+
+def get_position_converter(hass: HomeAssistant) -> PositionConverter:
+    """获取共享的坐标批量转换器"""
+    data = hass.data.setdefault(DOMAIN, {})
+    if 'position_converter' not in data:
+        data['position_converter'] = PositionConverter()
+    return data['position_converter']
+
+
+def get_geocoder(hass: HomeAssistant, key: str) -> AmapBatchGeocoder:
+    """获取高德密钥对应的共享批量查询器"""
+    geocoders = hass.data.setdefault(DOMAIN, {}).setdefault('geocoders', {})
+    if key not in geocoders:
+        geocoders[key] = AmapBatchGeocoder(hass, key)
+    return geocoders[key]
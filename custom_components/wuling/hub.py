@@ -0,0 +1,89 @@
+from typing import TYPE_CHECKING
+
+from homeassistant.core import HomeAssistant
+
+from .api import WulingApiClient
+from .const import DOMAIN, _LOGGER
+
+if TYPE_CHECKING:
+    from .coordinator import StateCoordinator
+
+# 请求的诊断数据（熔断状态、使用旧数据的端点），从协调器显示主协调器的值，不保存到快照
+LOCAL_DATA_KEYS = ('api_circuit', 'api_stale')
+
+
+class AccountHub:
+    """同一组账号凭据共享的账号中心
+
+    所有使用相同凭据的配置条目共用一个API客户端（连接池）、进行中的请求和短时响应缓存。同一辆车被多个配置条目添加时，只有第一个协调器（主协调器）轮询云端
+    并运行其他API的调度任务，其余协调器（从协调器）不再轮询，由主协调器在每次更新后同步数据；
+    主协调器卸载时由下一个协调器接替。
+    """
+
+    def __init__(self, hass: HomeAssistant, credentials: tuple):
+        self.hass = hass
+        self.credentials = credentials
+        self.client = WulingApiClient(hass, *credentials)
+        self.inflight_requests = {}  # 请求键 -> 进行中的请求任务
+        self.response_cache = {}  # 请求键 -> (过期时间, 响应)
+        self.refs = 0  # 使用该账号中心的协调器数量
+        self._vehicles = {}  # VIN -> 协调器列表，第一个为主协调器
+
+    def is_leader(self, coordinator: "StateCoordinator") -> bool:
+        members = self._vehicles.get(coordinator.vin)
+        return not members or members[0] is coordinator
+
+    def attach(self, coordinator: "StateCoordinator"):
+        """按VIN登记协调器，首个登记的成为主协调器并开始调度，其余的停止轮询"""
+        members = self._vehicles.setdefault(coordinator.vin, [])
+        if coordinator in members:
+            return
+        members.append(coordinator)
+        if members[0] is coordinator:
+            coordinator.async_become_leader()
+        else:
+            _LOGGER.info('车辆 %s 已由其他配置条目轮询，共享其数据', coordinator.vin_sort)
+            coordinator.async_become_follower()
+            coordinator.async_receive_shared(members[0].data, members[0].last_update_success)
+
+    def detach(self, coordinator: "StateCoordinator"):
+        """注销协调器，主协调器注销时由下一个协调器接替轮询"""
+        for vin, members in list(self._vehicles.items()):
+            if coordinator not in members:
+                continue
+            was_leader = members[0] is coordinator
+            members.remove(coordinator)
+            if not members:
+                del self._vehicles[vin]
+            elif was_leader:
+                members[0].async_become_leader()
+                self.hass.async_create_task(members[0].async_request_refresh())
+
+    def async_share(self, coordinator: "StateCoordinator"):
+        """主协调器更新后，把数据和获取结果同步给同一辆车的从协调器"""
+        members = self._vehicles.get(coordinator.vin)
+        if not members or members[0] is not coordinator:
+            return
+        for follower in members[1:]:
+            follower.async_receive_shared(coordinator.data, coordinator.last_update_success, coordinator.last_exception)
+
+
+def async_acquire_hub(hass: HomeAssistant, credentials: tuple) -> AccountHub:
+    """获取账号凭据对应的账号中心并增加引用计数"""
+    hubs = hass.data.setdefault(DOMAIN, {}).setdefault('hubs', {})
+    hub = hubs.get(credentials)
+    if hub is None:
+        hub = hubs[credentials] = AccountHub(hass, credentials)
+    hub.refs += 1
+    return hub
+
+
+async def async_release_hub(hass: HomeAssistant, hub: AccountHub):
+    """减少引用计数，最后一个使用者释放时关闭连接池"""
+    hub.refs -= 1
+    if hub.refs > 0:
+        return
+    hubs = hass.data.get(DOMAIN, {}).get('hubs', {})
+    if hubs.get(hub.credentials) is hub:
+        del hubs[hub.credentials]
+    await hub.client.close()
@@ -14,16 +14,15 @@ _LOGGER = logging.getLogger(__name__)
 
 
 async def async_setup_entry(hass, entry, async_add_entities):
+    entities = []
     coordinator = hass.data[entry.entry_id]['coordinator']
-    for conv in coordinator.converters:
-        # 只检查domain，不检查parent，允许子实体被添加
-        if conv.domain != ENTITY_DOMAIN:
-            continue
+    for conv in coordinator.domain_converters.get(ENTITY_DOMAIN, []):
         if conv.attr == 'door_lock':
-            entity = DoorLockEntity(coordinator, conv)
+            entities.append(DoorLockEntity(coordinator, conv))
         else:
-            entity = LockEntity(coordinator, conv)
-        async_add_entities([entity])
+            entities.append(LockEntity(coordinator, conv))
+    # 实体一次性添加
+    async_add_entities(entities)
 
 
 class LockEntity(XEntity, BaseEntity):
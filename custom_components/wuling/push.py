@@ -0,0 +1,75 @@
+from typing import TYPE_CHECKING, Callable, Optional
+
+from homeassistant.core import HomeAssistant, callback
+
+from .api import json_loads
+from .const import _LOGGER
+
+if TYPE_CHECKING:
+    from .coordinator import StateCoordinator
+
+
+class MqttPush:
+    """通过Home Assistant的MQTT集成接收车辆状态推送
+
+    五菱云端没有公开可订阅的推送接口，车辆状态需要由用户自己的桥接程序发布到Home Assistant所连接的
+    MQTT服务器，消息格式和桥接配置见readme的“MQTT推送”一节。
+    订阅mqtt_topic（可包含{vin}占位符，按车辆替换），消息体为JSON，格式与queryDefaultCarStatus的
+    响应相同：{"data": {"carStatus": {...}, "carInfo": {...}}}，也可以直接是data部分，可以只包含变化的字段。
+    消息中带有carInfo.vin且与车辆不符时忽略，因此多辆车可以共用一个主题。
+    收到的数据交给协调器按轮询数据同样的流程解码和分发；推送通道静默超过mqtt_silence_timeout秒后恢复轮询。
+    """
+
+    def __init__(self, hass: HomeAssistant, coordinator: "StateCoordinator", topic: str):
+        self.hass = hass
+        self.coordinator = coordinator
+        self.topic = topic.replace('{vin}', coordinator.vin)
+        self._unsub: Optional[Callable] = None
+
+    @staticmethod
+    def supported(car_info: dict) -> bool:
+        """carInfo.supportMqtt明确为否时五菱云端不会为车辆下发推送，桥接程序也就收不到数据；没有该字段时按支持处理"""
+        value = car_info.get('supportMqtt')
+        if value is None:
+            return True
+        return bool(value) and value not in ('0', 'no', 'off', 'false')
+
+    async def async_start(self) -> bool:
+        """订阅推送主题，MQTT集成不可用时返回False并继续轮询"""
+        try:
+            from homeassistant.components import mqtt
+        except ImportError:
+            return False
+        if 'mqtt' not in self.hass.config.components:
+            _LOGGER.warning('未配置MQTT集成，无法订阅车辆推送主题 %s', self.topic)
+            return False
+        try:
+            self._unsub = await mqtt.async_subscribe(self.hass, self.topic, self._async_message_received)
+        except Exception as exc:
+            _LOGGER.error('订阅车辆推送主题 %s 失败: %s', self.topic, exc)
+            return False
+        _LOGGER.info('已订阅车辆推送主题 %s', self.topic)
+        return True
+
+    @callback
+    def async_stop(self):
+        if self._unsub:
+            self._unsub()
+            self._unsub = None
+
+    @callback
+    def _async_message_received(self, msg):
+        try:
+            payload = json_loads(msg.payload)
+        except (TypeError, ValueError) as exc:
+            _LOGGER.warning('无法解析车辆推送消息 %s: %s', msg.topic, exc)
+            return
+        if not isinstance(payload, dict):
+            return
+        data = payload.get('data', payload)
+        if not isinstance(data, dict):
+            return
+        vin = (data.get('carInfo') or {}).get('vin')
+        if vin and self.coordinator.vin and vin != self.coordinator.vin:
+            return
+        self.coordinator.async_handle_push(data)
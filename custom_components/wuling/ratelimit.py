@@ -0,0 +1,82 @@
+import asyncio
+import heapq
+import itertools
+from urllib.parse import urlsplit
+
+from homeassistant.core import HomeAssistant
+
+from .const import DOMAIN, API_RATE_LIMIT, API_RATE_BURST
+
+# 优先级，数值越小越先获得令牌
+PRIORITY_CONTROL = 0  # 控制指令（车锁、空调、寻车等）
+PRIORITY_POLL = 1  # 后台轮询
+
+
+class TokenBucket:
+    """带优先级的令牌桶限流器
+
+    令牌按rate个/秒补充，最多积累burst个；没有令牌时请求按优先级排队，
+    控制指令总是排在后台轮询之前。
+    """
+
+    def __init__(self, rate: float = API_RATE_LIMIT, burst: int = API_RATE_BURST):
+        self.rate = rate
+        self.burst = burst
+        self._tokens = float(burst)
+        self._updated = None
+        self._waiters = []  # (priority, seq, future)
+        self._seq = itertools.count()
+        self._timer = None
+        self.total_wait = 0.0  # 累计等待时间（秒）
+        self.last_wait = 0.0  # 最近一次等待时间（秒）
+
+    def _refill(self, now: float):
+        if self._updated is not None:
+            self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    async def acquire(self, priority: int = PRIORITY_POLL) -> float:
+        """获取一个令牌，返回等待的秒数"""
+        loop = asyncio.get_running_loop()
+        start = loop.time()
+        self._refill(start)
+        if not self._waiters and self._tokens >= 1:
+            self._tokens -= 1
+            self.last_wait = 0.0
+            return 0.0
+
+        future = loop.create_future()
+        heapq.heappush(self._waiters, (priority, next(self._seq), future))
+        self._schedule(loop)
+        await future
+        wait = loop.time() - start
+        self.last_wait = wait
+        self.total_wait += wait
+        return wait
+
+    def _schedule(self, loop):
+        """发放可用令牌，并在下一个令牌补充时再次唤醒"""
+        self._refill(loop.time())
+        while self._waiters and self._tokens >= 1:
+            _, _, future = heapq.heappop(self._waiters)
+            if future.done():
+                # 等待方已取消
+                continue
+            self._tokens -= 1
+            future.set_result(None)
+        if self._waiters and self._timer is None:
+            delay = (1 - self._tokens) / self.rate
+            self._timer = loop.call_later(delay, self._on_timer, loop)
+
+    def _on_timer(self, loop):
+        self._timer = None
+        self._schedule(loop)
+
+
+def get_rate_limiter(hass: HomeAssistant, url: str, access_token: str, client_id: str) -> TokenBucket:
+    """获取进程级共享的限流器，按API主机和账号凭据区分"""
+    limiters = hass.data.setdefault(DOMAIN, {}).setdefault('rate_limiters', {})
+    key = (urlsplit(url).netloc, access_token, client_id)
+    if key not in limiters:
+        limiters[key] = TokenBucket()
+    return limiters[key]
@@ -0,0 +1,186 @@
+import asyncio
+import gzip
+import json
+import os
+from math import floor
+from typing import Optional
+
+from homeassistant.core import HomeAssistant
+
+from .const import DOMAIN, _LOGGER, REGION_DATA_FILES, REGION_GRID_SIZE
+
+# 随集成发布的行政区划数据目录；用户自行下载的数据放在Home Assistant配置目录的wuling目录下，
+# 不会在HACS更新集成时被删除。数据为阿里云DataV.GeoAtlas格式的区县级边界（GCJ-02坐标）
+REGION_DATA_DIR = os.path.join(os.path.dirname(__file__), 'data')
+
+
+def region_data_dirs(hass: HomeAssistant) -> list:
+    """按优先级返回查找行政区划数据的目录：配置目录/wuling，然后是集成自带的data目录"""
+    return [hass.config.path(DOMAIN), REGION_DATA_DIR]
+
+
+def _iter_polygons(geometry: dict):
+    """依次返回几何对象中的多边形（环列表），支持Polygon和MultiPolygon"""
+    if not geometry:
+        return
+    if geometry.get('type') == 'Polygon':
+        yield geometry.get('coordinates') or []
+    elif geometry.get('type') == 'MultiPolygon':
+        yield from geometry.get('coordinates') or []
+
+
+class _Polygon:
+    """行政区的一个多边形，边按网格行分组，判断时只检查与坐标同一行的边"""
+
+    __slots__ = ('region', 'bbox', 'rows')
+
+    def __init__(self, region: dict, rings: list, grid: float):
+        self.region = region
+        lngs = [point[0] for ring in rings for point in ring]
+        lats = [point[1] for ring in rings for point in ring]
+        self.bbox = (min(lngs), min(lats), max(lngs), max(lats))
+        self.rows = {}  # 网格行号 -> [(x1, y1, x2, y2)]
+        for ring in rings:
+            for index in range(len(ring)):
+                x1, y1 = ring[index - 1][:2]
+                x2, y2 = ring[index][:2]
+                if y1 == y2:
+                    # 水平边不会与水平射线相交
+                    continue
+                for row in range(floor(min(y1, y2) / grid), floor(max(y1, y2) / grid) + 1):
+                    self.rows.setdefault(row, []).append((x1, y1, x2, y2))
+
+    def contains(self, lng: float, lat: float, row: int) -> bool:
+        """射线法（奇偶规则）判断坐标是否在多边形内，内环（飞地、空洞）自然排除"""
+        inside = False
+        for x1, y1, x2, y2 in self.rows.get(row, ()):
+            if (y1 > lat) != (y2 > lat) and lng < x1 + (lat - y1) * (x2 - x1) / (y2 - y1):
+                inside = not inside
+        return inside
+
+
+class RegionIndex:
+    """离线行政区划查询
+
+    把最细一级（通常是区县级）边界多边形按REGION_GRID_SIZE度的网格建立索引：查询时先定位坐标所在格子，
+    再对格子内候选多边形做外接矩形过滤和射线法判断，不需要访问网络，也不需要高德密钥。
+    只能得到省、市、区县和行政区划代码，街道级地址仍需调用高德API。
+    """
+
+    def __init__(self, features: list, grid: float = REGION_GRID_SIZE):
+        self.grid = grid
+        self._cells = {}  # (列号, 行号) -> [_Polygon]
+        self.regions = 0
+        self.lookups = 0
+        self.misses = 0
+
+        names = {}
+        regions = []
+        for feature in features:
+            properties = feature.get('properties') or {}
+            adcode = str(properties.get('adcode') or '')
+            if len(adcode) != 6 or not adcode.isdigit() or properties.get('level') == 'country':
+                continue
+            names[adcode] = properties.get('name') or ''
+            regions.append((adcode, feature))
+        # 每个分支只索引最细一级的边界：有下级区域的省、市边界不参与查询，
+        # 数据中只有省级或市级边界的分支（如不设区的地级市）仍能查到上一级
+        parents = {parent for adcode, _ in regions for parent in self._parents(adcode)}
+        districts = [(adcode, feature) for adcode, feature in regions if adcode not in parents]
+
+        for adcode, feature in districts:
+            region = self._region(adcode, names)
+            for rings in _iter_polygons(feature.get('geometry')):
+                rings = [ring for ring in rings if len(ring) >= 3]
+                if not rings:
+                    continue
+                polygon = _Polygon(region, rings, grid)
+                min_lng, min_lat, max_lng, max_lat = polygon.bbox
+                for col in range(floor(min_lng / grid), floor(max_lng / grid) + 1):
+                    for row in range(floor(min_lat / grid), floor(max_lat / grid) + 1):
+                        self._cells.setdefault((col, row), []).append(polygon)
+            self.regions += 1
+
+    @staticmethod
+    def _parents(adcode: str) -> tuple:
+        """行政区划代码的上级省、市代码"""
+        parents = []
+        if not adcode.endswith('0000'):
+            parents.append(adcode[:2] + '0000')
+        if not adcode.endswith('00'):
+            parents.append(adcode[:4] + '00')
+        return tuple(parents)
+
+    @staticmethod
+    def _region(adcode: str, names: dict) -> dict:
+        """按行政区划代码的层级（前2位省、前4位市）补齐省市名称，直辖市没有市级名称"""
+        province = names.get(adcode[:2] + '0000', '')
+        city = names.get(adcode[:4] + '00', '') if adcode[2:4] != '00' else ''
+        district = names.get(adcode, '')
+        if adcode.endswith('0000'):
+            province, district = district, ''
+        elif adcode.endswith('00'):
+            city, district = district, ''
+        return {
+            'province': province,
+            'city': city if city != province else '',
+            'district': district,
+            'adcode': adcode,
+        }
+
+    def lookup(self, lng: float, lat: float) -> Optional[dict]:
+        """查询GCJ-02坐标所在的行政区，返回{province, city, district, adcode}，不在任何区域内时返回None"""
+        self.lookups += 1
+        col, row = floor(lng / self.grid), floor(lat / self.grid)
+        for polygon in self._cells.get((col, row), ()):
+            min_lng, min_lat, max_lng, max_lat = polygon.bbox
+            if min_lng <= lng <= max_lng and min_lat <= lat <= max_lat and polygon.contains(lng, lat, row):
+                return polygon.region
+        self.misses += 1
+        return None
+
+    def stats(self) -> dict:
+        return {
+            'regions': self.regions,
+            'cells': len(self._cells),
+            'lookups': self.lookups,
+            'misses': self.misses,
+        }
+
+
+def _load_region_index(directories: list) -> Optional[RegionIndex]:
+    for directory in directories:
+        for name in REGION_DATA_FILES:
+            path = os.path.join(directory, name)
+            if not os.path.isfile(path):
+                continue
+            opener = gzip.open if name.endswith('.gz') else open
+            with opener(path, 'rt', encoding='utf-8') as file:
+                features = json.load(file).get('features') or []
+            index = RegionIndex(features)
+            _LOGGER.info('已加载离线行政区划数据 %s，共 %s 个区域', path, index.regions)
+            return index
+    _LOGGER.debug('未找到离线行政区划数据（%s），地址仅通过高德API获取', '、'.join(directories))
+    return None
+
+
+async def async_get_region_index(hass: HomeAssistant) -> Optional[RegionIndex]:
+    """获取进程级共享的离线行政区划索引，首次使用时在线程池中加载，没有数据文件时返回None"""
+    domain_data = hass.data.setdefault(DOMAIN, {})
+    if 'region_index' in domain_data:
+        return domain_data['region_index']
+    # 多个协调器同时首次使用时只加载一次
+    loading = domain_data.get('region_index_loading')
+    if loading is None:
+        async def _load():
+            try:
+                index = await hass.async_add_executor_job(_load_region_index, region_data_dirs(hass))
+            except Exception as exc:
+                _LOGGER.error('加载离线行政区划数据失败: %s', exc)
+                index = None
+            domain_data['region_index'] = index
+            return index
+        loading = domain_data['region_index_loading'] = asyncio.ensure_future(_load())
+    index = await loading
+    domain_data.pop('region_index_loading', None)
+    return index
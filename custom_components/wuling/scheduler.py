@@ -0,0 +1,144 @@
+import asyncio
+import time
+from abc import ABC, abstractmethod
+from datetime import timedelta
+from typing import Awaitable, Callable, Optional
+
+from homeassistant.util import dt as dt_util
+
+from .const import _LOGGER
+
+
+class CadencePolicy(ABC):
+    """端点刷新节奏策略，根据上次执行时间计算下次执行时间"""
+
+    @abstractmethod
+    def next_run(self, last_run: float) -> float:
+        """返回下次执行的时间戳"""
+
+
+class FixedCadence(CadencePolicy):
+    """固定间隔刷新"""
+
+    def __init__(self, interval: Callable[[], float]):
+        self.interval = interval  # 返回刷新间隔（秒）的函数，每次调度时重新读取
+
+    def next_run(self, last_run: float) -> float:
+        return last_run + self.interval()
+
+
+class DailyCadence(CadencePolicy):
+    """每天本地零点后刷新一次，适用于昨日里程等按天变化的数据"""
+
+    def __init__(self, offset: float = 600):
+        self.offset = offset  # 零点后延迟的秒数，等待云端完成日结
+
+    def next_run(self, last_run: float) -> float:
+        last = dt_util.as_local(dt_util.utc_from_timestamp(last_run))
+        midnight = dt_util.start_of_local_day(last.date() + timedelta(days=1))
+        return midnight.timestamp() + self.offset
+
+
+class ConditionalCadence(CadencePolicy):
+    """按条件在两种间隔之间切换，如钥匙通电时快速刷新、停车时慢速刷新"""
+
+    def __init__(self, condition: Callable[[], bool], active: Callable[[], float], idle: Callable[[], float]):
+        self.condition = condition
+        self.active = active
+        self.idle = idle
+
+    def next_run(self, last_run: float) -> float:
+        interval = self.active() if self.condition() else self.idle()
+        return last_run + interval
+
+
+class Endpoint:
+    """调度器中的一个端点"""
+
+    def __init__(self, name: str, updater: Callable[[], Awaitable], policy: CadencePolicy):
+        self.name = name
+        self.updater = updater
+        self.policy = policy
+        self.last_run = 0
+        self.next_run = 0  # 0表示立即执行
+
+
+class EndpointScheduler:
+    """按端点独立节奏刷新的后台调度器
+
+    任务只在最近一个端点到期时唤醒，同一时刻到期的端点合并为一批交给runner执行；
+    修改刷新节奏时通过reschedule唤醒任务重新计算，不需要取消和重建任务。
+    """
+
+    def __init__(self, name: str, runner: Callable[[list], Awaitable]):
+        self.name = name
+        self._runner = runner
+        self._endpoints = {}
+        self._wake = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+
+    @property
+    def endpoints(self):
+        return self._endpoints
+
+    def add(self, name: str, updater: Callable[[], Awaitable], policy: CadencePolicy):
+        """注册端点"""
+        self._endpoints[name] = Endpoint(name, updater, policy)
+
+    def start(self):
+        """启动调度任务"""
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run(), name=self.name)
+
+    async def stop(self):
+        """停止调度任务"""
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+    def reschedule(self, *names: str, immediately: bool = True):
+        """重新计算端点的下次执行时间并唤醒调度任务
+
+        不指定names时作用于全部端点；immediately为True时立即执行，否则按策略从上次执行时间重新计算。
+        """
+        for endpoint in self._endpoints.values():
+            if names and endpoint.name not in names:
+                continue
+            if immediately or not endpoint.last_run:
+                endpoint.next_run = 0
+            else:
+                endpoint.next_run = endpoint.policy.next_run(endpoint.last_run)
+        self._wake.set()
+
+    def next_due(self) -> float:
+        """最近一个端点的到期时间"""
+        return min((e.next_run for e in self._endpoints.values()), default=float('inf'))
+
+    async def _run(self):
+        while True:
+            now = time.time()
+            due = [e for e in self._endpoints.values() if e.next_run <= now]
+            if due:
+                for endpoint in due:
+                    endpoint.last_run = now
+                    endpoint.next_run = endpoint.policy.next_run(now)
+                try:
+                    await self._runner([e.updater for e in due])
+                except asyncio.CancelledError:
+                    raise
+                except Exception as exc:
+                    _LOGGER.error('Error in %s: %s', self.name, exc)
+                continue
+
+            # 休眠到最近一个端点到期，期间可被reschedule唤醒
+            timeout = self.next_due() - now
+            self._wake.clear()
+            try:
+                await asyncio.wait_for(self._wake.wait(), timeout=None if timeout == float('inf') else timeout)
+            except asyncio.TimeoutError:
+                pass
@@ -15,11 +15,11 @@ _LOGGER = logging.getLogger(__name__)
 
 async def async_setup_entry(hass, entry, async_add_entities):
     coordinator = hass.data[entry.entry_id]['coordinator']
-    for conv in coordinator.converters:
-        # 只检查domain，不检查parent，允许子实体被添加
-        if conv.domain != ENTITY_DOMAIN:
-            continue
-        async_add_entities([SelectEntity(coordinator, conv)])
+    # 实体一次性添加
+    async_add_entities([
+        SelectEntity(coordinator, conv)
+        for conv in coordinator.domain_converters.get(ENTITY_DOMAIN, [])
+    ])
 
 
 class SelectEntity(XEntity, BaseEntity):
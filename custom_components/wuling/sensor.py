@@ -16,14 +16,11 @@ _LOGGER = logging.getLogger(__name__)
 
 async def async_setup_entry(hass, entry, async_add_entities):
     coordinator = hass.data[entry.entry_id]['coordinator']
-    for conv in coordinator.converters:
-        # 只检查domain，不检查parent，允许子实体被添加
-        if conv.domain != ENTITY_DOMAIN:
-            continue
-        # 检查转换器是否带有__internal_use标记，如果有则跳过添加实体
-        if conv.option and conv.option.get('__internal_use'):
-            continue
-        async_add_entities([SensorEntity(coordinator, conv)])
+    # 实体一次性添加，带__internal_use标记的转换器已在domain_converters中排除
+    async_add_entities([
+        SensorEntity(coordinator, conv)
+        for conv in coordinator.domain_converters.get(ENTITY_DOMAIN, [])
+    ])
 
 class SensorEntity(XEntity, BaseEntity):
     def __init__(self, coordinator: StateCoordinator, conv: Converter):
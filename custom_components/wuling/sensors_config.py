@@ -25,7 +25,9 @@ from .converters import (
     TimeStampConv,
     SelectConv,
     TireTempConv,
+    CircuitStateConv,
 )
+from .const import READ_ONLY_APIS
 
 
 def create_converters():
@@ -550,6 +552,20 @@ def create_converters():
         TimeStampConv('last_door_notification_time', prop='last_door_notification_time').with_option({
             'icon': 'mdi:bell-outline',
             'device_class': SensorDeviceClass.TIMESTAMP,
-        })
+        }),
+
+        # =========================================
+        # 15. 诊断传感器
+        # =========================================
+        # 云端API熔断状态，各端点的状态作为属性
+        CircuitStateConv('api_circuit_state', prop='api_circuit', childs={*READ_ONLY_APIS, 'stale_apis'}).with_option({
+            'icon': 'mdi:electric-switch',
+            'entity_category': EntityCategory.DIAGNOSTIC,
+            # 车辆状态接口失败时其他实体不可用，该实体仍显示熔断状态
+            'always_available': True,
+        }),
     ]
+    # 预编译所有属性路径，解码时无需再拆分字符串
+    for conv in converters:
+        conv.compile()
     return converters
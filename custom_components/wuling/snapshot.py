@@ -0,0 +1,49 @@
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.storage import Store
+
+from .const import DOMAIN, SNAPSHOT_VERSION, SNAPSHOT_SAVE_DELAY
+from .hub import LOCAL_DATA_KEYS
+
+
+class SnapshotStore:
+    """配置条目最近一次成功获取的车辆数据快照
+
+    Home Assistant重启时先用快照创建实体，不必等待五菱云端响应，首次刷新在后台进行。
+    快照只在实体状态真正变化时延迟写入，多次更新合并为一次磁盘写入。
+    格式：{"default": 默认车辆的data}
+    """
+
+    def __init__(self, hass: HomeAssistant, entry_id: str):
+        self.hass = hass
+        self.entry_id = entry_id
+        self._store = Store(hass, SNAPSHOT_VERSION, f'{DOMAIN}.{entry_id}.snapshot')
+        self._save_pending = False
+        self._last = {}  # 最近一次加载或保存的快照
+
+    async def async_load(self) -> dict:
+        self._last = await self._store.async_load() or {}
+        return self._last
+
+    @callback
+    def async_schedule_save(self):
+        # Store每次调用都会重新计时，已有待写入的快照时不再调用，避免频繁更新时一直推迟写入
+        if self._save_pending:
+            return
+        self._save_pending = True
+        self._store.async_delay_save(self._data_to_save, SNAPSHOT_SAVE_DELAY)
+
+    async def async_remove(self):
+        await self._store.async_remove()
+
+    @callback
+    def _data_to_save(self) -> dict:
+        self._save_pending = False
+        coordinator = self.hass.data.get(self.entry_id, {}).get('coordinator')
+        if coordinator is None:
+            # 配置条目已卸载，保留原有快照
+            return self._last
+        # 诊断数据（熔断状态等）只对本次运行有意义，不写入快照
+        data = {k: v for k, v in coordinator.data.items() if k not in LOCAL_DATA_KEYS}
+        snapshot = {'default': data}
+        self._last = snapshot
+        return snapshot
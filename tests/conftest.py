@@ -0,0 +1,68 @@
+import asyncio
+import json
+import sys
+from pathlib import Path
+
+import pytest
+
+# 直接运行pytest（不通过python -m pytest）时也能从仓库根目录导入custom_components
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from homeassistant.config_entries import ConfigEntry  # noqa: E402
+from homeassistant.core import HomeAssistant  # noqa: E402
+
+VIN = 'LZWADAGA0NB000001'
+SNAPSHOT = {
+    'carStatus': {'collectTime': 1700000000000, 'batterySoc': '50', 'keyStatus': '0', 'doorLockStatus': '0'},
+    'carInfo': {'vin': VIN, 'carName': '宝骏云朵', 'supportMqtt': True},
+}
+ENTRY_DATA = {'access_token': 'token', 'client_id': 'client', 'client_secret': 'secret'}
+STATUS_API = 'userCarRelation/queryDefaultCarStatus'
+
+
+def status_response(soc='60', collect_time=1700000060000):
+    return {
+        'data': {
+            'carStatus': {**SNAPSHOT['carStatus'], 'batterySoc': soc, 'collectTime': collect_time},
+            'carInfo': dict(SNAPSHOT['carInfo']),
+        },
+        'systemTimeMillis': collect_time,
+    }
+
+
+def stub_requests(coordinator, responses):
+    """车辆状态接口按顺序返回responses中的响应，用完后和其他接口一样请求失败"""
+    async def request_once(api, **kwargs):
+        if api == STATUS_API and responses:
+            return responses.pop(0)
+        return None
+    coordinator._async_request_once = request_once
+
+
+@pytest.fixture
+def run_coordinator(tmp_path):
+    """在带有Home Assistant实例的事件循环中运行测试协程，协程接收hass和已恢复快照的主协调器
+
+    run_coordinator(test, data=None, options=None, snapshot=SNAPSHOT)
+    """
+    from custom_components.wuling.coordinator import StateCoordinator
+
+    def run(test, data=None, options=None, snapshot=SNAPSHOT):
+        async def main():
+            hass = HomeAssistant(str(tmp_path))
+            entry = ConfigEntry(
+                version=1, minor_version=1, domain='wuling', title='五菱汽车', source='user',
+                data={**ENTRY_DATA, **(data or {})}, options=options or {},
+            )
+            coordinator = StateCoordinator(hass, entry)
+            if snapshot:
+                coordinator.async_restore(json.loads(json.dumps(snapshot)))
+            coordinator.hub.attach(coordinator)
+            try:
+                await test(hass, coordinator)
+                await hass.async_block_till_done()
+            finally:
+                await coordinator.async_shutdown()
+                await hass.async_stop(force=True)
+        asyncio.run(main())
+    return run
@@ -0,0 +1,153 @@
+"""协调器测试：车辆状态接口失败时使用旧数据、其他API的分发不改变实体可用状态、从协调器同步获取结果"""
+import time
+
+import pytest
+
+from custom_components.wuling import coordinator as coordinator_module
+from custom_components.wuling.circuit import STATE_OPEN
+from custom_components.wuling.const import STALE_UNAVAILABLE_AFTER
+from custom_components.wuling.coordinator import StateCoordinator
+from conftest import SNAPSHOT, STATUS_API, status_response, stub_requests
+
+# 关闭结果缓存，每次刷新都经过请求桩
+OPTIONS = {'request_cache_ttl': 0}
+
+
+@pytest.fixture(autouse=True)
+def no_retry_delay(monkeypatch):
+    monkeypatch.setattr(coordinator_module, 'API_RETRY_BASE_DELAY', 0)
+
+
+@pytest.fixture
+def run(run_coordinator):
+    """停止其他API的后台调度，测试中只由测试代码发起刷新"""
+    def runner(test, **kwargs):
+        async def wrapped(hass, coordinator):
+            await coordinator.other_api_scheduler.stop()
+            await test(hass, coordinator)
+        run_coordinator(wrapped, options=OPTIONS, **kwargs)
+    return runner
+
+
+def test_failed_poll_keeps_last_good_data(run):
+    async def test(hass, coordinator):
+        stub_requests(coordinator, [status_response('60')])
+        await coordinator.async_refresh()
+        assert coordinator.last_update_success
+        assert coordinator.data['carStatus']['batterySoc'] == '60'
+
+        # 重试全部失败：实体保持可用，仍显示最后一次成功的数据，过期端点列在api_stale中
+        await coordinator.async_refresh()
+        assert coordinator.last_update_success
+        assert coordinator.data['carStatus']['batterySoc'] == '60'
+        assert coordinator.data['api_stale'] == [STATUS_API]
+        assert coordinator.payload['stale_apis'] == [STATUS_API]
+
+        # 恢复后清除过期标记
+        stub_requests(coordinator, [status_response('70', 1700000120000)])
+        await coordinator.async_refresh()
+        assert coordinator.data['api_stale'] == []
+        assert coordinator.data['carStatus']['batterySoc'] == '70'
+    run(test)
+
+
+def test_long_open_circuit_makes_entities_unavailable(run):
+    async def test(hass, coordinator):
+        stub_requests(coordinator, [status_response()])
+        await coordinator.async_refresh()
+        breaker = coordinator._breakers[STATUS_API]
+
+        await coordinator.async_refresh()
+        assert coordinator.last_update_success
+
+        # 熔断且持续失败超过STALE_UNAVAILABLE_AFTER秒
+        breaker.state, breaker.opened_at = STATE_OPEN, time.monotonic()
+        coordinator._status_failing_since = time.monotonic() - STALE_UNAVAILABLE_AFTER - 1
+        await coordinator.async_refresh()
+        assert not coordinator.last_update_success
+        assert coordinator.data['api_circuit'][STATUS_API] == STATE_OPEN
+    run(test)
+
+
+def test_failed_poll_without_data_is_unavailable(run):
+    async def test(hass, coordinator):
+        stub_requests(coordinator, [])
+        await coordinator.async_refresh()
+        assert not coordinator.last_update_success
+    run(test, snapshot=None)
+
+
+def test_other_apis_do_not_reset_availability(run):
+    async def test(hass, coordinator):
+        stub_requests(coordinator, [])
+        coordinator.data.pop('carStatus')
+        await coordinator.async_refresh()
+        assert not coordinator.last_update_success
+
+        updates = []
+        coordinator.async_add_listener(lambda: updates.append(coordinator.last_update_success))
+
+        async def update_tire():
+            coordinator.data['tirePressure'] = {'leftFrontTirePressure': '250'}
+        await coordinator.async_update_other_apis([update_tire])
+        # 数据已分发，但车辆状态接口仍然失败，实体保持不可用
+        assert updates == [False]
+        assert not coordinator.last_update_success
+    run(test)
+
+
+def test_follower_shares_leader_availability(run):
+    async def test(hass, leader):
+        # 同一账号的另一个配置条目添加了同一辆车
+        follower = StateCoordinator(hass, leader.entry)
+        follower.async_restore({'carInfo': dict(SNAPSHOT['carInfo'])})
+        follower.hub.attach(follower)
+        try:
+            assert not follower.hub.is_leader(follower)
+            assert follower.data['carStatus'] == leader.data['carStatus']
+
+            # 主协调器获取失败（没有可用的旧数据）时，从协调器的实体同样不可用
+            stub_requests(leader, [])
+            leader.data.pop('carStatus')
+            await leader.async_refresh()
+            assert not leader.last_update_success
+            assert not follower.last_update_success
+            assert follower.last_exception is leader.last_exception
+            assert follower.data['api_stale'] == [STATUS_API]
+
+            stub_requests(leader, [status_response('80')])
+            await leader.async_refresh()
+            assert follower.last_update_success
+            assert follower.data['carStatus']['batterySoc'] == '80'
+            assert follower.data['api_stale'] == []
+        finally:
+            await follower.async_shutdown()
+    run(test)
+
+
+def test_stale_responses_are_not_cached(run):
+    async def test(hass, coordinator):
+        coordinator.request_cache_ttl = 60
+        calls = []
+        responses = [status_response('60'), None, None, None, status_response('70')]
+
+        async def request_once(api, **kwargs):
+            calls.append(api)
+            return responses.pop(0)
+        coordinator._async_request_once = request_once
+
+        await coordinator.async_request(STATUS_API)
+        coordinator.hub.response_cache.clear()
+        # 三次尝试都失败，返回标记为stale的旧数据
+        result = await coordinator.async_request(STATUS_API)
+        assert result['stale']
+        assert len(calls) == 4
+        # 旧数据没有进入缓存，下一次调用重新请求
+        result = await coordinator.async_request(STATUS_API)
+        assert 'stale' not in result
+        assert result['data']['carStatus']['batterySoc'] == '70'
+        assert len(calls) == 5
+        # 成功的结果在缓存有效期内复用
+        await coordinator.async_request(STATUS_API)
+        assert len(calls) == 5
+    run(test)
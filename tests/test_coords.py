@@ -0,0 +1,105 @@
+"""坐标转换测试：NumPy批量实现与逐点实现结果一致，逆转换能还原原始坐标，同时提交的车辆坐标合并为一次批量转换"""
+import asyncio
+
+import pytest
+
+from custom_components.wuling import coords
+from custom_components.wuling.geocoder import PositionConverter
+
+np = pytest.importorskip('numpy')
+
+# WGS-84坐标：北京、柳州、乌鲁木齐、哈尔滨、三沙
+IN_CHINA = [
+    (116.397428, 39.90923),
+    (109.411703, 24.314617),
+    (87.616848, 43.825592),
+    (126.642464, 45.756967),
+    (112.338695, 16.831839),
+]
+# 境外坐标：东京、巴黎、悉尼、纽约
+OUT_OF_CHINA = [
+    (139.691706, 35.689487),
+    (2.352222, 48.856614),
+    (151.209296, -33.86882),
+    (-74.005974, 40.712776),
+]
+POINTS = IN_CHINA + OUT_OF_CHINA
+
+
+@pytest.fixture
+def pure_python(monkeypatch):
+    """没有安装NumPy时的逐点实现"""
+    monkeypatch.setattr(coords, 'np', None)
+
+
+@pytest.mark.parametrize('convert', [coords.wgs84_to_gcj02_many, coords.gcj02_to_wgs84_many])
+def test_numpy_matches_pure_python(convert, monkeypatch):
+    vectorized = convert(POINTS)
+    monkeypatch.setattr(coords, 'np', None)
+    scalar = convert(POINTS)
+    assert len(vectorized) == len(scalar) == len(POINTS)
+    for (v_lng, v_lat), (s_lng, s_lat) in zip(vectorized, scalar):
+        assert v_lng == pytest.approx(s_lng, abs=1e-9)
+        assert v_lat == pytest.approx(s_lat, abs=1e-9)
+
+
+def test_in_china_points_are_offset():
+    for (lng, lat), (gcj_lng, gcj_lat) in zip(IN_CHINA, coords.wgs84_to_gcj02_many(IN_CHINA)):
+        # 偏移量为几百米，约0.001到0.01度
+        assert 1e-4 < abs(gcj_lng - lng) + abs(gcj_lat - lat) < 0.02
+
+
+def test_out_of_china_points_are_unchanged():
+    assert coords.wgs84_to_gcj02_many(OUT_OF_CHINA) == OUT_OF_CHINA
+    assert coords.gcj02_to_wgs84_many(OUT_OF_CHINA) == OUT_OF_CHINA
+
+
+@pytest.mark.parametrize('backend', ['numpy', 'pure_python'])
+def test_inverse_round_trip(backend, request):
+    if backend == 'pure_python':
+        request.getfixturevalue('pure_python')
+    restored = coords.gcj02_to_wgs84_many(coords.wgs84_to_gcj02_many(POINTS))
+    for (lng, lat), (r_lng, r_lat) in zip(POINTS, restored):
+        assert r_lng == pytest.approx(lng, abs=1e-8)
+        assert r_lat == pytest.approx(lat, abs=1e-8)
+
+
+def test_scalar_round_trip():
+    for lng, lat in POINTS:
+        r_lng, r_lat = coords.gcj02_to_wgs84(*coords.wgs84_to_gcj02(lng, lat))
+        assert r_lng == pytest.approx(lng, abs=1e-8)
+        assert r_lat == pytest.approx(lat, abs=1e-8)
+
+
+def test_array_input_returns_array():
+    array = np.array(POINTS)
+    result = coords.wgs84_to_gcj02_many(array)
+    assert isinstance(result, np.ndarray)
+    assert result.shape == array.shape
+    assert coords.wgs84_to_gcj02_many([]) == []
+    assert coords.wgs84_to_gcj02_many(np.empty((0, 2))).shape == (0, 2)
+
+
+def test_position_converter_batches_concurrent_positions():
+    async def main():
+        converter = PositionConverter()
+        results = await asyncio.gather(*(converter.async_convert(lng, lat) for lng, lat in POINTS))
+        assert converter.batches == 1
+        assert converter.points == len(POINTS)
+        for (lng, lat), (gcj_lng, gcj_lat) in zip(POINTS, results):
+            expected_lng, expected_lat = coords.wgs84_to_gcj02(lng, lat)
+            assert gcj_lng == pytest.approx(expected_lng, abs=1e-9)
+            assert gcj_lat == pytest.approx(expected_lat, abs=1e-9)
+
+        # 之后单独提交的坐标是新的一批
+        await converter.async_convert(*IN_CHINA[0])
+        assert converter.batches == 2
+    asyncio.run(main())
+
+
+def test_geocoding_converts_through_shared_converter(run_coordinator):
+    async def test(hass, coordinator):
+        coordinator.amap_key = None
+        await coordinator._get_address_from_gaode(*IN_CHINA[1])
+        assert hass.data['wuling']['position_converter'].points == 1
+    run_coordinator(test)
@@ -0,0 +1,181 @@
+"""状态分发测试：只写入订阅的属性有变化的实体、EXTRA_DEPENDENCIES中的附加数据、可用状态变化时写入全部实体，以及轮询没有新数据时跳过分发"""
+import pytest
+
+from custom_components.wuling import coordinator as coordinator_module
+from conftest import STATUS_API, status_response, stub_requests
+
+
+class FakeEntity:
+    """记录状态写入次数的实体，按真实实体的方式注册到协调器"""
+
+    def __init__(self, coordinator, attr):
+        conv = next(conv for conv in coordinator.converters if conv.attr == attr)
+        self.attr = attr
+        self.added = True
+        self.writes = 0
+        self.subscribed_attrs = coordinator.subscribe_attrs(conv)
+        coordinator.add_entity(self)
+
+    def async_set_state(self, state):
+        self.state = state.get(self.attr)
+
+    def async_write_ha_state(self):
+        self.writes += 1
+
+
+def add_entities(coordinator, *attrs):
+    entities = {attr: FakeEntity(coordinator, attr) for attr in attrs}
+    # 首次分发写入全部实体
+    coordinator.async_publish()
+    for entity in entities.values():
+        entity.writes = 0
+    return entities
+
+
+def writes(entities):
+    return {attr: entity.writes for attr, entity in entities.items()}
+
+
+@pytest.fixture(autouse=True)
+def no_retry_delay(monkeypatch):
+    monkeypatch.setattr(coordinator_module, 'API_RETRY_BASE_DELAY', 0)
+
+
+@pytest.fixture
+def run(run_coordinator):
+    """停止其他API的后台调度，关闭结果缓存，测试中只由测试代码发起刷新"""
+    def runner(test):
+        async def wrapped(hass, coordinator):
+            await coordinator.other_api_scheduler.stop()
+            await test(hass, coordinator)
+        run_coordinator(wrapped, options={'request_cache_ttl': 0})
+    return runner
+
+
+def test_only_changed_entities_are_written(run):
+    async def test(hass, coordinator):
+        entities = add_entities(coordinator, 'battery', 'key_status', 'location')
+        suppressed = coordinator.suppressed_writes
+
+        coordinator.data['carStatus']['batterySoc'] = '60'
+        coordinator.async_publish()
+        # location的子属性battery_level同样来自batterySoc
+        assert writes(entities) == {'battery': 1, 'key_status': 0, 'location': 1}
+        assert entities['battery'].state == 60
+        assert coordinator.suppressed_writes == suppressed + 1
+
+        # 数据没有变化时不写入任何实体
+        coordinator.async_publish()
+        assert writes(entities) == {'battery': 1, 'key_status': 0, 'location': 1}
+        assert coordinator.suppressed_writes == suppressed + 4
+    run(test)
+
+
+def test_extra_dependencies_trigger_writes(run):
+    async def test(hass, coordinator):
+        entities = add_entities(coordinator, 'battery', 'location', 'address')
+
+        # carInfo中没有对应转换器的字段变化时，位置实体的附加信息也需要更新；轮询和推送都整体替换分组
+        coordinator.data['carInfo'] = {**coordinator.data['carInfo'], 'seriesCode': 'E300'}
+        coordinator.async_publish()
+        assert writes(entities) == {'battery': 0, 'location': 1, 'address': 0}
+
+        coordinator.data['gaode_address_detail'] = {'formatted_address': '广西柳州市城中区'}
+        coordinator.async_publish()
+        assert writes(entities) == {'battery': 0, 'location': 1, 'address': 1}
+    run(test)
+
+
+def test_availability_change_writes_all_entities(run):
+    async def test(hass, coordinator):
+        entities = add_entities(coordinator, 'battery', 'key_status')
+
+        coordinator.last_update_success = False
+        coordinator.async_publish()
+        assert writes(entities) == {'battery': 1, 'key_status': 1}
+
+        # 可用状态不变时恢复按变化写入
+        coordinator.async_publish()
+        assert writes(entities) == {'battery': 1, 'key_status': 1}
+
+        coordinator.last_update_success = True
+        coordinator.async_publish()
+        assert writes(entities) == {'battery': 2, 'key_status': 2}
+    run(test)
+
+
+def test_entities_that_are_not_added_only_receive_state(run):
+    async def test(hass, coordinator):
+        entities = add_entities(coordinator, 'battery')
+        entities['battery'].added = False
+        coordinator.data['carStatus']['batterySoc'] = '70'
+        coordinator.async_publish()
+        assert entities['battery'].state == 70
+        assert entities['battery'].writes == 0
+    run(test)
+
+
+def test_subscriber_index(run):
+    async def test(hass, coordinator):
+        battery = FakeEntity(coordinator, 'battery')
+        location = FakeEntity(coordinator, 'location')
+        address = FakeEntity(coordinator, 'address')
+        assert coordinator._subscribers['battery'] == [battery]
+        assert coordinator._subscribers['battery_level'] == [location]
+        # EXTRA_DEPENDENCIES中的键同样加入索引
+        assert coordinator._subscribers['carInfo'] == [location]
+        assert coordinator._subscribers['gaode_address_detail'] == [address]
+        assert address in coordinator._subscribers['address']
+
+        # 同一属性重新注册时替换旧实体，不重复订阅
+        replacement = FakeEntity(coordinator, 'battery')
+        assert coordinator._subscribers['battery'] == [replacement]
+        assert coordinator.entities['battery'] is replacement
+
+        coordinator.remove_entity('location')
+        assert coordinator._subscribers['battery_level'] == []
+        assert coordinator._subscribers['carInfo'] == []
+        assert 'location' not in coordinator.entities
+    run(test)
+
+
+def test_poll_without_new_data_skips_dispatch(run):
+    async def test(hass, coordinator):
+        entities = add_entities(coordinator, 'battery')
+        stub_requests(coordinator, [status_response('60'), status_response('60')])
+        await coordinator.async_refresh()
+        assert entities['battery'].writes == 1
+        payload = coordinator.payload
+
+        # collectTime相同且协调器写入的数据没有变化：不解码、不分发
+        skipped = coordinator.skipped_dispatches
+        await coordinator.async_refresh()
+        assert coordinator.skipped_dispatches == skipped + 1
+        assert coordinator.payload is payload
+        assert entities['battery'].writes == 1
+
+        # 车辆数据没有变化，但协调器写入的数据（这里是地址）变化时仍然分发
+        stub_requests(coordinator, [status_response('60')])
+        coordinator.data['address'] = '广西柳州市城中区'
+        await coordinator.async_refresh()
+        assert coordinator.skipped_dispatches == skipped + 1
+        assert coordinator.payload is not payload
+    run(test)
+
+
+def test_failed_poll_dispatches_only_when_stale_state_changes(run):
+    async def test(hass, coordinator):
+        entities = add_entities(coordinator, 'battery')
+        stub_requests(coordinator, [status_response('60')])
+        await coordinator.async_refresh()
+        skipped = coordinator.skipped_dispatches
+
+        # 第一次失败时过期端点变化，需要分发
+        await coordinator.async_refresh()
+        assert coordinator.payload['stale_apis'] == [STATUS_API]
+        assert coordinator.skipped_dispatches == skipped
+        # 继续失败且状态没有变化时跳过
+        await coordinator.async_refresh()
+        assert coordinator.skipped_dispatches == skipped + 1
+        assert entities['battery'].state == 60
+    run(test)
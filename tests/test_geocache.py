@@ -0,0 +1,70 @@
+"""逆地理编码缓存测试：缓存内容不含完整响应，删除最后一个配置条目时删除缓存文件"""
+import asyncio
+import os
+
+from homeassistant.config_entries import ConfigEntries, ConfigEntry
+from homeassistant.core import HomeAssistant
+
+from custom_components.wuling import async_remove_entry
+from custom_components.wuling.geocache import async_get_geocode_cache, async_remove_geocode_cache, geohash
+from conftest import ENTRY_DATA
+
+DETAIL = {
+    'full_result': {'status': '1', 'info': 'OK', 'regeocode': {'formatted_address': '广西柳州市城中区'}},
+    'regeocode': {'formatted_address': '广西柳州市城中区'},
+    'formatted_address': '广西柳州市城中区',
+}
+
+
+def run(test, tmp_path):
+    async def main():
+        hass = HomeAssistant(str(tmp_path))
+        hass.config_entries = ConfigEntries(hass, {})
+        try:
+            await test(hass)
+        finally:
+            await hass.async_stop(force=True)
+    asyncio.run(main())
+
+
+def test_cached_detail_excludes_full_result(tmp_path):
+    async def test(hass):
+        cache = await async_get_geocode_cache(hass)
+        cell = geohash(24.3264, 109.4281, 7)
+        cache.put(cell, '广西柳州市城中区', DETAIL)
+        address, detail = cache.get(cell)
+        assert address == '广西柳州市城中区'
+        assert 'full_result' not in detail
+        assert detail['regeocode'] == DETAIL['regeocode']
+        assert 'full_result' not in cache._data_to_save()['entries'][0][1][2]
+    run(test, tmp_path)
+
+
+def test_remove_last_entry_deletes_cache_file(tmp_path):
+    async def test(hass):
+        cache = await async_get_geocode_cache(hass)
+        cache.put(geohash(24.3264, 109.4281, 7), '广西柳州市城中区', DETAIL)
+        await cache._store.async_save(cache._data_to_save())
+        path = os.path.join(hass.config.path('.storage'), 'wuling.geocode_cache')
+        assert os.path.isfile(path)
+
+        entry = ConfigEntry(
+            version=1, minor_version=1, domain='wuling', title='五菱汽车', source='user', data=ENTRY_DATA,
+        )
+        await async_remove_entry(hass, entry)
+        assert not os.path.exists(path)
+        # 删除后重新获取的是空缓存
+        assert (await async_get_geocode_cache(hass)).stats()['entries'] == 0
+    run(test, tmp_path)
+
+
+def test_remove_cache_that_was_never_loaded(tmp_path):
+    async def test(hass):
+        storage = hass.config.path('.storage')
+        os.makedirs(storage)
+        path = os.path.join(storage, 'wuling.geocode_cache')
+        with open(path, 'w') as file:
+            file.write('{"version": 1, "key": "wuling.geocode_cache", "data": {"entries": []}}')
+        await async_remove_geocode_cache(hass)
+        assert not os.path.exists(path)
+    run(test, tmp_path)
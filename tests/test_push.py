@@ -0,0 +1,98 @@
+"""MQTT推送测试：消息解析、按车架号过滤、增量合并和推送静默后恢复轮询"""
+import json
+import time
+from types import SimpleNamespace
+
+import pytest
+
+from custom_components.wuling.push import MqttPush
+from conftest import SNAPSHOT, VIN
+
+TOPIC = 'wuling/{vin}'
+
+
+def message(push, payload):
+    body = payload if isinstance(payload, (str, bytes)) else json.dumps(payload)
+    return SimpleNamespace(topic=push.topic, payload=body)
+
+
+def test_topic_vin_placeholder(run_coordinator):
+    async def test(hass, coordinator):
+        push = MqttPush(hass, coordinator, TOPIC)
+        assert push.topic == f'wuling/{VIN}'
+    run_coordinator(test)
+
+
+def test_push_merges_changed_fields(run_coordinator):
+    async def test(hass, coordinator):
+        push = MqttPush(hass, coordinator, TOPIC)
+        push._async_message_received(message(push, {'data': {'carStatus': {'batterySoc': '60'}}}))
+        # 只推送了变化的字段，其余字段保留轮询得到的值
+        assert coordinator.data['carStatus'] == {**SNAPSHOT['carStatus'], 'batterySoc': '60'}
+        assert coordinator.data['carInfo'] == SNAPSHOT['carInfo']
+        # 也可以直接推送data部分
+        push._async_message_received(message(push, {'carStatus': {'keyStatus': '2'}}))
+        assert coordinator.data['carStatus']['keyStatus'] == '2'
+        assert coordinator.data['carStatus']['batterySoc'] == '60'
+        assert coordinator.push_active
+        assert coordinator.update_interval.total_seconds() == coordinator.push_silence_timeout
+    run_coordinator(test)
+
+
+def test_push_ignores_other_vehicles_and_invalid_messages(run_coordinator):
+    async def test(hass, coordinator):
+        push = MqttPush(hass, coordinator, TOPIC)
+        other = {'data': {'carStatus': {'batterySoc': '10'}, 'carInfo': {'vin': 'LZWADAGA0NB000002'}}}
+        push._async_message_received(message(push, other))
+        push._async_message_received(message(push, 'not json'))
+        push._async_message_received(message(push, [1, 2]))
+        push._async_message_received(message(push, {'data': 'offline'}))
+        assert coordinator.data['carStatus']['batterySoc'] == '50'
+        assert not coordinator.push_active
+        # 带有相同车架号的消息正常处理
+        same = {'data': {'carStatus': {'batterySoc': '70'}, 'carInfo': {'vin': VIN}}}
+        push._async_message_received(message(push, same))
+        assert coordinator.data['carStatus']['batterySoc'] == '70'
+        assert coordinator.data['carInfo']['carName'] == '宝骏云朵'
+    run_coordinator(test)
+
+
+def test_silence_restores_polling(run_coordinator):
+    async def test(hass, coordinator):
+        push = MqttPush(hass, coordinator, TOPIC)
+        original = coordinator.update_interval
+        push._async_message_received(message(push, {'carStatus': {'batterySoc': '60'}}))
+        assert coordinator.push_active
+
+        async def async_request(api, **kwargs):
+            return {'data': json.loads(json.dumps(SNAPSHOT)), 'systemTimeMillis': 1700000060000}
+        coordinator.async_request = async_request
+
+        # 静默时间未超过mqtt_silence_timeout时保持推送模式
+        await coordinator._async_update_data()
+        assert coordinator.push_active
+
+        coordinator.last_push = time.time() - coordinator.push_silence_timeout - 1
+        await coordinator._async_update_data()
+        assert not coordinator.push_active
+        assert coordinator.update_interval == original
+    run_coordinator(test)
+
+
+@pytest.mark.parametrize('value, supported', [
+    (True, True), (1, True), ('1', True), (None, True),
+    (False, False), (0, False), ('0', False), ('false', False),
+])
+def test_support_mqtt(value, supported):
+    car_info = {} if value is None else {'supportMqtt': value}
+    assert MqttPush.supported(car_info) is supported
+
+
+def test_push_never_polls_faster_than_base_rate(run_coordinator):
+    async def test(hass, coordinator):
+        push = MqttPush(hass, coordinator, TOPIC)
+        push._async_message_received(message(push, {'carStatus': {'batterySoc': '60'}}))
+        assert coordinator.push_active
+        # 设置的刷新速率比静默超时更长时，推送期间沿用设置的刷新速率
+        assert coordinator.update_interval.total_seconds() == 900
+    run_coordinator(test, options={'basic_api_refresh_rate': 900})
@@ -0,0 +1,98 @@
+"""限流器测试：控制指令优先于后台轮询、取消的等待方不占用令牌、令牌按速率补充"""
+import asyncio
+
+import pytest
+
+from custom_components.wuling.ratelimit import PRIORITY_CONTROL, PRIORITY_POLL, TokenBucket
+
+
+def run(test):
+    asyncio.run(test())
+
+
+async def acquire_all(bucket, requests, order):
+    """按顺序发起请求并排入队列，返回各请求的任务"""
+    async def acquire(name, priority):
+        await bucket.acquire(priority)
+        order.append(name)
+
+    tasks = [asyncio.create_task(acquire(name, priority)) for name, priority in requests]
+    # 让所有任务进入等待队列
+    await asyncio.sleep(0)
+    return tasks
+
+
+def test_burst_is_available_immediately():
+    async def test():
+        bucket = TokenBucket(rate=1, burst=3)
+        for _ in range(3):
+            assert await bucket.acquire() == 0.0
+        assert bucket.total_wait == 0.0
+    run(test)
+
+
+def test_control_is_served_before_poll():
+    async def test():
+        bucket = TokenBucket(rate=50, burst=1)
+        await bucket.acquire()
+        order = []
+        tasks = await acquire_all(bucket, [
+            ('poll1', PRIORITY_POLL), ('poll2', PRIORITY_POLL), ('control', PRIORITY_CONTROL),
+        ], order)
+        await asyncio.gather(*tasks)
+        # 控制指令后到也先获得令牌，同一优先级按排队顺序
+        assert order == ['control', 'poll1', 'poll2']
+    run(test)
+
+
+def test_new_request_waits_behind_queue():
+    async def test():
+        bucket = TokenBucket(rate=50, burst=1)
+        await bucket.acquire()
+        order = []
+        tasks = await acquire_all(bucket, [('poll1', PRIORITY_POLL)], order)
+        # 令牌补充后，已在排队的请求先于新请求获得令牌
+        await asyncio.sleep(0.05)
+        tasks += await acquire_all(bucket, [('poll2', PRIORITY_POLL)], order)
+        await asyncio.gather(*tasks)
+        assert order == ['poll1', 'poll2']
+    run(test)
+
+
+def test_cancelled_waiter_does_not_consume_token():
+    async def test():
+        bucket = TokenBucket(rate=20, burst=1)
+        await bucket.acquire()
+        order = []
+        cancelled, waiting = await acquire_all(bucket, [
+            ('cancelled', PRIORITY_CONTROL), ('poll', PRIORITY_POLL),
+        ], order)
+        cancelled.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await cancelled
+        await waiting
+        assert order == ['poll']
+        # 下一个令牌补充前没有多余的令牌
+        assert bucket._tokens < 1
+        assert not bucket._waiters
+    run(test)
+
+
+def test_refill_rate():
+    async def test():
+        bucket = TokenBucket(rate=20, burst=1)
+        await bucket.acquire()
+        loop = asyncio.get_running_loop()
+        start = loop.time()
+        wait = await bucket.acquire()
+        # 每个令牌需要1/rate秒补充
+        assert 0.04 <= wait < 0.2
+        assert loop.time() - start == pytest.approx(wait, abs=0.01)
+        assert bucket.last_wait == wait
+        assert bucket.total_wait == wait
+
+        # 空闲期间最多积累burst个令牌
+        await asyncio.sleep(0.2)
+        assert await bucket.acquire() == 0.0
+        assert await bucket.acquire() > 0
+    run(test)
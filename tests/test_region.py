@@ -0,0 +1,143 @@
+"""离线行政区划查询测试：使用简化的正方形边界代替真实数据"""
+import asyncio
+import gzip
+import json
+import os
+
+import pytest
+from homeassistant.core import HomeAssistant
+
+from custom_components.wuling import region
+from custom_components.wuling.region import RegionIndex
+
+
+def square(min_lng, min_lat, max_lng, max_lat):
+    return {
+        'type': 'Polygon',
+        'coordinates': [[
+            [min_lng, min_lat], [max_lng, min_lat], [max_lng, max_lat], [min_lng, max_lat], [min_lng, min_lat],
+        ]],
+    }
+
+
+def feature(adcode, name, level, geometry):
+    return {
+        'type': 'Feature',
+        'properties': {'adcode': adcode, 'name': name, 'level': level},
+        'geometry': geometry,
+    }
+
+
+# 广西：柳州市下有城中区，梧州市只有市级边界；海南只有省级边界；北京是直辖市，区直接属于省级
+FEATURES = [
+    feature(100000, '中华人民共和国', 'country', square(100, 10, 120, 45)),
+    feature(450000, '广西壮族自治区', 'province', square(108, 21, 112, 26)),
+    feature(450200, '柳州市', 'city', square(109, 24, 110, 25)),
+    feature(450202, '城中区', 'district', {
+        'type': 'MultiPolygon',
+        'coordinates': [square(109.2, 24.2, 109.5, 24.5)['coordinates'], square(109.7, 24.7, 109.9, 24.9)['coordinates']],
+    }),
+    feature(450204, '柳南区', 'district', square(109.0, 24.0, 109.2, 24.2)),
+    feature(450400, '梧州市', 'city', square(110.5, 23, 111.5, 24)),
+    feature(460000, '海南省', 'province', square(108.5, 18, 111, 20)),
+    feature(110000, '北京市', 'province', square(115.5, 39.5, 117.5, 41)),
+    feature(110105, '朝阳区', 'district', square(116.4, 39.8, 116.7, 40.1)),
+]
+
+
+@pytest.fixture
+def index():
+    return RegionIndex(FEATURES)
+
+
+def test_lookup_district(index):
+    assert index.lookup(109.3, 24.3) == {
+        'province': '广西壮族自治区',
+        'city': '柳州市',
+        'district': '城中区',
+        'adcode': '450202',
+    }
+    # MultiPolygon的第二个多边形
+    assert index.lookup(109.8, 24.8)['adcode'] == '450202'
+    assert index.lookup(109.1, 24.1)['adcode'] == '450204'
+
+
+def test_lookup_municipality(index):
+    assert index.lookup(116.5, 39.9) == {
+        'province': '北京市',
+        'city': '',
+        'district': '朝阳区',
+        'adcode': '110105',
+    }
+
+
+def test_lookup_falls_back_per_branch(index):
+    # 梧州市和海南省没有下级边界，使用各自最细一级的边界
+    assert index.lookup(111, 23.5) == {
+        'province': '广西壮族自治区',
+        'city': '梧州市',
+        'district': '',
+        'adcode': '450400',
+    }
+    assert index.lookup(110, 19) == {
+        'province': '海南省',
+        'city': '',
+        'district': '',
+        'adcode': '460000',
+    }
+
+
+def test_parent_boundaries_are_not_indexed(index):
+    # 有下级区域的省、市和国家边界不参与查询
+    assert index.lookup(109.6, 24.6) is None
+    assert index.lookup(108.5, 25.5) is None
+    assert index.lookup(105, 30) is None
+    assert index.regions == 5
+
+
+def test_lookup_stats(index):
+    index.lookup(109.3, 24.3)
+    index.lookup(0, 0)
+    assert index.stats()['lookups'] == 2
+    assert index.stats()['misses'] == 1
+
+
+def write_features(directory, name, features):
+    os.makedirs(directory, exist_ok=True)
+    opener = gzip.open if name.endswith('.gz') else open
+    with opener(os.path.join(directory, name), 'wt', encoding='utf-8') as file:
+        json.dump({'type': 'FeatureCollection', 'features': features}, file, ensure_ascii=False)
+
+
+@pytest.mark.parametrize('name', ['districts.geojson.gz', 'districts.geojson'])
+def test_load_region_index(name, tmp_path):
+    write_features(tmp_path, name, FEATURES)
+    index = region._load_region_index([str(tmp_path)])
+    assert index.lookup(109.3, 24.3)['district'] == '城中区'
+
+
+def test_load_region_index_without_data(tmp_path):
+    assert region._load_region_index([str(tmp_path / 'missing'), str(tmp_path)]) is None
+
+
+def test_config_directory_takes_priority(tmp_path, monkeypatch):
+    """用户放在配置目录wuling下的数据不随集成更新删除，优先于集成自带的数据"""
+    bundled = tmp_path / 'bundled'
+    monkeypatch.setattr(region, 'REGION_DATA_DIR', str(bundled))
+    write_features(bundled, 'districts.geojson.gz', FEATURES[:4])
+
+    async def main():
+        hass = HomeAssistant(str(tmp_path / 'config'))
+        try:
+            assert region.region_data_dirs(hass) == [str(tmp_path / 'config' / 'wuling'), str(bundled)]
+            # 配置目录没有数据时使用集成自带的数据
+            index = await region.async_get_region_index(hass)
+            assert index.regions == 1
+            hass.data['wuling'].pop('region_index')
+
+            write_features(tmp_path / 'config' / 'wuling', 'districts.geojson', FEATURES)
+            index = await region.async_get_region_index(hass)
+            assert index.regions == 5
+        finally:
+            await hass.async_stop(force=True)
+    asyncio.run(main())
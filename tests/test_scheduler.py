@@ -0,0 +1,148 @@
+"""端点调度器测试：休眠到最近的端点到期、同时到期的端点合并为一批、reschedule不重建任务，以及各刷新节奏策略"""
+import asyncio
+from datetime import datetime
+from zoneinfo import ZoneInfo
+
+import pytest
+from homeassistant.util import dt as dt_util
+
+from custom_components.wuling.scheduler import ConditionalCadence, DailyCadence, EndpointScheduler, FixedCadence
+
+SHANGHAI = ZoneInfo('Asia/Shanghai')
+
+
+def run(test):
+    """test接收调度器和记录每批端点名称的列表"""
+    async def main():
+        batches = []
+
+        async def runner(updaters):
+            batches.append([await updater() for updater in updaters])
+
+        scheduler = EndpointScheduler('test_scheduler', runner)
+        try:
+            await test(scheduler, batches)
+        finally:
+            await scheduler.stop()
+    asyncio.run(main())
+
+
+def endpoint(name):
+    async def updater():
+        return name
+    return updater
+
+
+def test_due_endpoints_run_in_one_batch():
+    async def test(scheduler, batches):
+        scheduler.add('status', endpoint('status'), FixedCadence(lambda: 60))
+        scheduler.add('tire', endpoint('tire'), FixedCadence(lambda: 60))
+        scheduler.add('mileage', endpoint('mileage'), FixedCadence(lambda: 60))
+        scheduler.start()
+        await asyncio.sleep(0.05)
+        assert batches == [['status', 'tire', 'mileage']]
+    run(test)
+
+
+def test_sleeps_until_next_endpoint_is_due():
+    async def test(scheduler, batches):
+        scheduler.add('fast', endpoint('fast'), FixedCadence(lambda: 0.1))
+        scheduler.add('slow', endpoint('slow'), FixedCadence(lambda: 60))
+        scheduler.start()
+        await asyncio.sleep(0.05)
+        assert batches == [['fast', 'slow']]
+        assert scheduler.next_due() == scheduler.endpoints['fast'].next_run
+        # 到期前不执行，到期后只执行到期的端点
+        await asyncio.sleep(0.1)
+        assert batches == [['fast', 'slow'], ['fast']]
+    run(test)
+
+
+def test_idle_scheduler_waits_without_endpoints():
+    async def test(scheduler, batches):
+        scheduler.start()
+        await asyncio.sleep(0.05)
+        assert scheduler.next_due() == float('inf')
+        assert batches == []
+        # 之后注册的端点通过reschedule唤醒任务
+        scheduler.add('status', endpoint('status'), FixedCadence(lambda: 60))
+        scheduler.reschedule()
+        await asyncio.sleep(0.05)
+        assert batches == [['status']]
+    run(test)
+
+
+def test_reschedule_wakes_task_without_recreating_it():
+    async def test(scheduler, batches):
+        interval = {'tire': 60}
+        scheduler.add('status', endpoint('status'), FixedCadence(lambda: 60))
+        scheduler.add('tire', endpoint('tire'), FixedCadence(lambda: interval['tire']))
+        scheduler.start()
+        await asyncio.sleep(0.05)
+        task = scheduler._task
+        assert batches == [['status', 'tire']]
+
+        # 立即执行指定的端点
+        scheduler.reschedule('tire')
+        await asyncio.sleep(0.05)
+        assert batches == [['status', 'tire'], ['tire']]
+
+        # 缩短间隔后从上次执行时间重新计算
+        interval['tire'] = 0.1
+        scheduler.reschedule('tire', immediately=False)
+        last_run = scheduler.endpoints['tire'].last_run
+        assert scheduler.endpoints['tire'].next_run == pytest.approx(last_run + 0.1)
+        await asyncio.sleep(0.15)
+        assert batches[-1] == ['tire']
+        assert scheduler._task is task
+        assert not task.done()
+    run(test)
+
+
+def test_runner_errors_do_not_stop_scheduler():
+    async def main():
+        calls = []
+
+        async def runner(updaters):
+            calls.append(len(updaters))
+            raise RuntimeError('request failed')
+
+        scheduler = EndpointScheduler('test_scheduler', runner)
+        scheduler.add('status', endpoint('status'), FixedCadence(lambda: 0.05))
+        scheduler.start()
+        try:
+            await asyncio.sleep(0.12)
+            assert len(calls) >= 2
+            assert not scheduler._task.done()
+        finally:
+            await scheduler.stop()
+        assert scheduler._task is None
+    asyncio.run(main())
+
+
+@pytest.fixture
+def shanghai():
+    dt_util.set_default_time_zone(SHANGHAI)
+    yield
+    dt_util.set_default_time_zone(dt_util.UTC)
+
+
+@pytest.mark.parametrize('last_run, expected', [
+    (datetime(2024, 1, 1, 14, 30), datetime(2024, 1, 2, 0, 10)),
+    (datetime(2024, 1, 1, 23, 59), datetime(2024, 1, 2, 0, 10)),
+    # 零点后已经刷新过，下一次在第二天
+    (datetime(2024, 1, 2, 0, 10), datetime(2024, 1, 3, 0, 10)),
+    (datetime(2024, 12, 31, 8, 0), datetime(2025, 1, 1, 0, 10)),
+])
+def test_daily_cadence_runs_after_local_midnight(shanghai, last_run, expected):
+    policy = DailyCadence(offset=600)
+    next_run = policy.next_run(last_run.replace(tzinfo=SHANGHAI).timestamp())
+    assert next_run == expected.replace(tzinfo=SHANGHAI).timestamp()
+
+
+def test_conditional_cadence_follows_condition():
+    state = {'key_on': False}
+    policy = ConditionalCadence(lambda: state['key_on'], active=lambda: 60, idle=lambda: 3600)
+    assert policy.next_run(1000) == 4600
+    state['key_on'] = True
+    assert policy.next_run(1000) == 1060